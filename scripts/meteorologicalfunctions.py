@@ -312,7 +312,7 @@ def molen(T,AH,p,ustar,heatflux,fluxtype='sensible'):
     elif fluxtype=='kinematic':
         L = -Tvp*(ustar**3)/(c.g*c.k*heatflux)
     else:
-        raise Exception(" meteorologicalfunctions.molen: unkown value for fluxtype (="+str(fluxtype)+") encountered")
+        raise ValueError(" meteorologicalfunctions.molen: unkown value for fluxtype (="+str(fluxtype)+") encountered")
     return L
 
 def specifichumidityfromrelativehumidity(RH, T, p):
@@ -3,7 +3,6 @@ import datetime
 import logging
 import os
 import sys
-import traceback
 # 3rd party modules
 # PFP modules
 from scripts import pfp_clim
@@ -70,9 +69,7 @@ def do_L1_batch(main_ui, cf_level):
                 logger.error(msg)
         except Exception:
             msg = "Error occurred during L1 processing " + cf_file_name[1]
-            logger.error(msg)
-            error_message = traceback.format_exc()
-            logger.error(error_message)
+            logger.exception(msg)
             continue
     return 1
 def do_L2_batch(main_ui, cf_level):
@@ -127,9 +124,7 @@ def do_L2_batch(main_ui, cf_level):
                 logger.error(msg)
         except Exception:
             msg = "Error occurred during L2 processing " + cf_file_name[1]
-            logger.error(msg)
-            error_message = traceback.format_exc()
-            logger.error(error_message)
+            logger.exception(msg)
             continue
     return 1
 def do_L3_batch(main_ui, cf_level):
@@ -183,9 +178,7 @@ def do_L3_batch(main_ui, cf_level):
             logger.info("")
         except Exception:
             msg = "Error occurred during L3 processing " + cf_file_name[1]
-            logger.error(msg)
-            error_message = traceback.format_exc()
-            logger.error(error_message)
+            logger.exception(msg)
             continue
     return 1
 def do_ecostress_batch(main_ui, cf_level):
@@ -207,9 +200,7 @@ def do_ecostress_batch(main_ui, cf_level):
             logger.info("")
         except Exception:
             msg = "Error occurred during ECOSTRESS output with " + cf_file_name[1]
-            logger.error(msg)
-            error_message = traceback.format_exc()
-            logger.error(error_message)
+            logger.exception(msg)
             continue
     return 1
 def do_fluxnet_batch(main_ui, cf_level):
@@ -277,9 +268,7 @@ def do_concatenate_batch(main_ui, cf_level):
             logger.info("")
         except Exception:
             msg = "Error occurred during concatenation with " + cf_file_name[1]
-            logger.error(msg)
-            error_message = traceback.format_exc()
-            logger.error(error_message)
+            logger.exception(msg)
             continue
     return 1
 def do_climatology_batch(main_ui, cf_level):
@@ -303,9 +292,7 @@ def do_climatology_batch(main_ui, cf_level):
             logger.info("")
         except Exception:
             msg = "Error occurred during climatology with " + cf_file_name[1]
-            logger.error(msg)
-            error_message = traceback.format_exc()
-            logger.error(error_message)
+            logger.exception(msg)
             continue
     return 1
 def do_cpd_barr_batch(main_ui, cf_level):
@@ -333,9 +320,7 @@ def do_cpd_barr_batch(main_ui, cf_level):
             logger.info("")
         except Exception:
             msg = "Error occurred during CPD (Barr) with " + cf_file_name[1]
-            logger.error(msg)
-            error_message = traceback.format_exc()
-            logger.error(error_message)
+            logger.exception(msg)
             continue
     return 1
 def do_cpd_mchugh_batch(main_ui, cf_level):
@@ -363,9 +348,7 @@ def do_cpd_mchugh_batch(main_ui, cf_level):
             logger.info("")
         except Exception:
             msg = "Error occurred during CPD (McHugh) with " + cf_file_name[1]
-            logger.error(msg)
-            error_message = traceback.format_exc()
-            logger.error(error_message)
+            logger.exception(msg)
             continue
     return 1
 def do_cpd_mcnew_batch(main_ui, cf_level):
@@ -393,9 +376,7 @@ def do_cpd_mcnew_batch(main_ui, cf_level):
             logger.info("")
         except Exception:
             msg = "Error occurred during CPD (McNew) with " + cf_file_name[1]
-            logger.error(msg)
-            error_message = traceback.format_exc()
-            logger.error(error_message)
+            logger.exception(msg)
             continue
     return 1
 def do_mpt_batch(main_ui, cf_level):
@@ -423,9 +404,7 @@ def do_mpt_batch(main_ui, cf_level):
             logger.info("")
         except Exception:
             msg = "Error occurred during MPT with " + cf_file_name[1]
-            logger.error(msg)
-            error_message = traceback.format_exc()
-            logger.error(error_message)
+            logger.exception(msg)
             continue
     return 1
 def do_L4_batch(main_ui, cf_level):
@@ -463,9 +442,7 @@ def do_L4_batch(main_ui, cf_level):
             logger.info("")
         except Exception:
             msg = "Error occurred during L4 with " + cf_file_name[1]
-            logger.error(msg)
-            error_message = traceback.format_exc()
-            logger.error(error_message)
+            logger.exception(msg)
             continue
     return 1
 def do_L5_batch(main_ui, cf_level):
@@ -508,9 +485,7 @@ def do_L5_batch(main_ui, cf_level):
                 logger.error(msg)
         except Exception:
             msg = "Error occurred during L5 with " + cf_file_name[1]
-            logger.error(msg)
-            error_message = traceback.format_exc()
-            logger.error(error_message)
+            logger.exception(msg)
             continue
     return 1
 def do_L6_batch(main_ui, cf_level):
@@ -550,9 +525,7 @@ def do_L6_batch(main_ui, cf_level):
                 logger.error(msg)
         except Exception:
             msg = "Error occurred during L6 with " + cf_file_name[1]
-            logger.error(msg)
-            error_message = traceback.format_exc()
-            logger.error(error_message)
+            logger.exception(msg)
             continue
     return 1
 def do_levels_batch(main_ui):
@@ -580,80 +553,34 @@ def do_levels_batch(main_ui):
         msg = "No [Options] section in control file"
         logger.error(msg)
         sys.exit()
-    processing_levels = ["l1", "l2", "l3",
-                         "ecostress", "fluxnet", "reddyproc",
-                         "concatenate", "climatology",
-                         "cpd_barr", "cpd_mchugh", "cpd_mcnew", "mpt",
-                         "l4", "l5", "l6"]
+    # batch processing routine for each level, built once and used as a lookup table
+    batch_functions = {"l1": do_L1_batch,                  # L1 processing
+                       "l2": do_L2_batch,                  # L2 processing
+                       "l3": do_L3_batch,                  # L3 processing
+                       "ecostress": do_ecostress_batch,    # netCDF to ECOSTRESS CSV
+                       "fluxnet": do_fluxnet_batch,        # netCDF to FluxNet CSV
+                       "reddyproc": do_reddyproc_batch,    # netCDF to REddyProc CSV
+                       "concatenate": do_concatenate_batch,
+                       "climatology": do_climatology_batch,
+                       "cpd_barr": do_cpd_barr_batch,      # ustar threshold from change point detection
+                       "cpd_mchugh": do_cpd_mchugh_batch,  # ustar threshold from change point detection
+                       "cpd_mcnew": do_cpd_mcnew_batch,    # ustar threshold from change point detection
+                       "mpt": do_mpt_batch,                # ustar threshold from change point detection
+                       "l4": do_L4_batch,                  # L4 processing
+                       "l5": do_L5_batch,                  # L5 processing
+                       "l6": do_L6_batch}                  # L6 processing
     for level in levels:
         # check the stop flag
         if main_ui.stop_flag:
             # break out of the loop if user requested stop
             break
-        if level.lower() not in processing_levels:
+        batch_function = batch_functions.get(level.lower())
+        if batch_function is None:
             msg = "Unrecognised level " + level
             logger.warning(msg)
             continue
-        if level.lower() == "l1":
-            # L1 processing
-            if not do_L1_batch(main_ui, cf_batch["Levels"][level]):
-                break
-        elif level.lower() == "l2":
-            # L2 processing
-            if not do_L2_batch(main_ui, cf_batch["Levels"][level]):
-                break
-        elif level.lower() == "l3":
-            # L3 processing
-            if not do_L3_batch(main_ui, cf_batch["Levels"][level]):
-                break
-        elif level.lower() == "ecostress":
-            # convert netCDF files to ECOSTRESS CSV files
-            if not do_ecostress_batch(main_ui, cf_batch["Levels"][level]):
-                break
-        elif level.lower() == "fluxnet":
-            # convert netCDF files to FluxNet CSV files
-            if not do_fluxnet_batch(main_ui, cf_batch["Levels"][level]):
-                break
-        elif level.lower() == "reddyproc":
-            # convert netCDF files to REddyProc CSV files
-            if not do_reddyproc_batch(main_ui, cf_batch["Levels"][level]):
-                break
-        elif level.lower() == "concatenate":
-            # concatenate netCDF files
-            if not do_concatenate_batch(main_ui, cf_batch["Levels"][level]):
-                break
-        elif level.lower() == "climatology":
-            # climatology
-            if not do_climatology_batch(main_ui, cf_batch["Levels"][level]):
-                break
-        elif level.lower() == "cpd_barr":
-            # ustar threshold from change point detection
-            if not do_cpd_barr_batch(main_ui, cf_batch["Levels"][level]):
-                break
-        elif level.lower() == "cpd_mchugh":
-            # ustar threshold from change point detection
-            if not do_cpd_mchugh_batch(main_ui, cf_batch["Levels"][level]):
-                break
-        elif level.lower() == "cpd_mcnew":
-            # ustar threshold from change point detection
-            if not do_cpd_mcnew_batch(main_ui, cf_batch["Levels"][level]):
-                break
-        elif level.lower() == "mpt":
-            # ustar threshold from change point detection
-            if not do_mpt_batch(main_ui, cf_batch["Levels"][level]):
-                break
-        elif level.lower() == "l4":
-            # L4 processing
-            if not do_L4_batch(main_ui, cf_batch["Levels"][level]):
-                break
-        elif level.lower() == "l5":
-            # L5 processing
-            if not do_L5_batch(main_ui, cf_batch["Levels"][level]):
-                break
-        elif level.lower() == "l6":
-            # L6 processing
-            if not do_L6_batch(main_ui, cf_batch["Levels"][level]):
-                break
+        if not batch_function(main_ui, cf_batch["Levels"][level]):
+            break
     end = datetime.datetime.now()
     msg = " Finished batch processing at " + end.strftime("%Y%m%d%H%M")
     logger.info(msg)
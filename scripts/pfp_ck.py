@@ -2,6 +2,7 @@
 import copy
 import datetime
 import logging
+import warnings
 # 3rd party
 import numpy
 import dateutil.parser
@@ -40,34 +41,32 @@ def ApplyRangeCheckToVariable(variable):
     Author: PRI
     Date: September 2016
     """
+    if (("rangecheck_lower" not in variable["Attr"]) and
+        ("rangecheck_upper" not in variable["Attr"])):
+        return
     dt = variable["DateTime"]
+    month = numpy.array([d.month for d in dt])
+    # build a single mask of out-of-range elements from the lower and upper limits
+    mask = numpy.zeros(len(dt), dtype=bool)
+    valid_range = variable["Attr"]["valid_range"]
     # Check to see if a lower limit has been specified
     if "rangecheck_lower" in variable["Attr"]:
         attr = variable["Attr"]["rangecheck_lower"]
         lower = numpy.array(parse_rangecheck_limit(attr))
         valid_lower = str(numpy.min(lower))
-        month = numpy.array([dt[i].month for i in range(0,len(dt))])
-        lower_series = lower[month-1]
-        index = numpy.ma.where(variable["Data"]<lower_series)[0]
-        variable["Data"][index] = numpy.ma.masked
-        variable["Flag"][index] = numpy.int32(2)
-        valid_range = variable["Attr"]["valid_range"]
+        mask |= numpy.ma.filled(variable["Data"] < lower[month-1], False)
         old_lower = valid_range.split(",")[0]
         valid_range = valid_range.replace(old_lower,valid_lower)
-        variable["Attr"]["valid_range"] = valid_range
     if "rangecheck_upper" in variable["Attr"]:
         attr = variable["Attr"]["rangecheck_upper"]
         upper = numpy.array(parse_rangecheck_limit(attr))
-        valid_upper = str(numpy.min(upper))
-        month = numpy.array([dt[i].month for i in range(0,len(dt))])
-        upper_series = upper[month-1]
-        index = numpy.ma.where(variable["Data"]>upper_series)[0]
-        variable["Data"][index] = numpy.ma.masked
-        variable["Flag"][index] = numpy.int32(2)
-        valid_range = variable["Attr"]["valid_range"]
+        valid_upper = str(numpy.max(upper))
+        mask |= numpy.ma.filled(variable["Data"] > upper[month-1], False)
         old_upper = valid_range.split(",")[1]
         valid_range = valid_range.replace(old_upper,valid_upper)
-        variable["Attr"]["valid_range"] = valid_range
+    variable["Data"][mask] = numpy.ma.masked
+    variable["Flag"][mask] = numpy.int32(2)
+    variable["Attr"]["valid_range"] = valid_range
     return
 
 def ApplyTurbulenceFilter(cf, ds, l5_info, ustar_threshold=None):
@@ -169,13 +168,16 @@ def ApplyTurbulenceFilter(cf, ds, l5_info, ustar_threshold=None):
             msg = " Series " + label + " has already been filtered, skipping ..."
             logger.warning(msg)
             continue
-        # save the non-filtered data
-        var_nofilter = copy.deepcopy(var)
+        # save the non-filtered data, CreateVariable copies the variable so there
+        # is no need to copy the data here
+        var_nofilter = dict(var)
         var_nofilter["Label"] = var["Label"] + "_nofilter"
         pfp_utils.CreateVariable(ds, var_nofilter)
         iris["not_output"].append(var_nofilter["Label"])
-        # now apply the filter
-        var_filtered = copy.deepcopy(var)
+        # now apply the filter, only the attributes need copying because the
+        # data and flag are replaced by new arrays
+        var_filtered = dict(var)
+        var_filtered["Attr"] = dict(var["Attr"])
         var_filtered["Data"] = numpy.ma.masked_where(indicators["final"]["Data"] == 0,
                                                      var["Data"], copy=True)
         var_filtered["Flag"] = numpy.copy(var["Flag"])
@@ -361,14 +363,19 @@ def do_diurnalcheck(cf, ds, section, series, code=5):
         if len(mindex) != 0:
             lHdh = Hdh[mindex]
             l2ds = ds.root["Variables"][series]["Data"][mindex]
-            for i in range(nInts):
-                li = numpy.where((abs(lHdh-(float(i)/float(n)))<c.eps)&(l2ds!=float(c.missing_value)))
-                if numpy.size(li)!=0:
-                    Av[i] = numpy.mean(l2ds[li])
-                    Sd[i] = numpy.std(l2ds[li])
-                else:
-                    Av[i] = float(c.missing_value)
-                    Sd[i] = float(c.missing_value)
+            # get the average and standard deviation at each time step of the day
+            # in one pass over the month rather than one pass per time step
+            Av[:] = float(c.missing_value)
+            Sd[:] = float(c.missing_value)
+            step = numpy.rint(n*lHdh).astype(int)
+            ok = ((abs(lHdh-step/float(n))<c.eps)&(l2ds!=float(c.missing_value))&
+                  (step<nInts))
+            step = step[ok]
+            num = numpy.bincount(step, minlength=nInts)
+            idx = numpy.where(num!=0)[0]
+            Av[idx] = numpy.bincount(step, weights=l2ds[ok], minlength=nInts)[idx]/num[idx]
+            dev = l2ds[ok] - Av[step]
+            Sd[idx] = numpy.sqrt(numpy.bincount(step, weights=dev*dev, minlength=nInts)[idx]/num[idx])
             Lwr = Av - NSd[m-1]*Sd
             Upr = Av + NSd[m-1]*Sd
             hindex = numpy.array(n*lHdh,int)
@@ -584,8 +591,8 @@ def do_excludehours(cf,ds,section,series,code=7):
     ldt = ds.root["Variables"]['DateTime']['Data']
     ExcludeList = list(cf[section][series]['ExcludeHours'].keys())
     NumExclude = len(ExcludeList)
-    Hour = numpy.array([d.hour for d in ldt])
-    Minute = numpy.array([d.minute for d in ldt])
+    # time of day in minutes so each excluded hour is matched with a single comparison
+    TimeOfDay = numpy.array([d.hour*60 + d.minute for d in ldt])
     for i in range(NumExclude):
         exclude_hours_string = cf[section][series]['ExcludeHours'][str(i)]
         ExcludeHourList = exclude_hours_string.split(",")
@@ -600,9 +607,8 @@ def do_excludehours(cf,ds,section,series,code=7):
         except ValueError:
             ei = -1
         for j in range(2,len(ExcludeHourList)):
-            ExHr = datetime.datetime.strptime(ExcludeHourList[j],'%H:%M').hour
-            ExMn = datetime.datetime.strptime(ExcludeHourList[j],'%H:%M').minute
-            idx = numpy.where((Hour[si:ei] == ExHr) & (Minute[si:ei] == ExMn))[0] + si
+            ExTime = datetime.datetime.strptime(ExcludeHourList[j],'%H:%M')
+            idx = numpy.where(TimeOfDay[si:ei] == ExTime.hour*60 + ExTime.minute)[0] + si
             ds.root["Variables"][series]['Data'][idx] = numpy.float64(c.missing_value)
             ds.root["Variables"][series]['Flag'][idx] = numpy.int32(code)
             ds.root["Variables"][series]['Attr']['ExcludeHours_'+str(i)] = cf[section][series]['ExcludeHours'][str(i)]
@@ -854,7 +860,8 @@ def do_madfilter(cf, ds, section, label, code=24):
         pctl1 = float(opt.split(",")[0])
         pctl2 = float(opt.split(",")[1])
         a = numpy.ma.compressed(var["Data"])
-        edge_threshold = abs(numpy.percentile(a, pctl2) - numpy.percentile(a, pctl1))
+        p1, p2 = numpy.percentile(a, [pctl1, pctl2])
+        edge_threshold = abs(p2 - p1)
     else:
         edge_threshold = float(opt)
     inao["edge_threshold"] = float(edge_threshold)
@@ -901,8 +908,6 @@ def do_madfilter_1(var, Fsd, info, code=24):
     addons = int(leftover_nrecs/n_windows)
     # new size for all windows but the last one
     window_nrecs = window_nrecs + addons
-    # size of the last window
-    last_window_nrecs = window_nrecs + (nrecs - n_windows * window_nrecs)
     # arrays of ones and zeros for general use and an array of MAD flags
     ones = numpy.ones(nrecs, dtype=int)
     zeros = numpy.zeros(nrecs, dtype=int)
@@ -942,32 +947,22 @@ def do_madfilter_1(var, Fsd, info, code=24):
         dm1 = vzi["Data"][1:nrecs-1] - vzi["Data"][0:nrecs-2]
         dp1 = vzi["Data"][2:] - vzi["Data"][1:nrecs-1]
         vzi["differences"][1:nrecs-1] = (dm1 - dp1)
-        # loop over the windows, default is 13 days
-        for i in range(n_windows):
-            si = i * window_nrecs
-            ei = si + window_nrecs
-            if i == n_windows-1:
-                ei = si + last_window_nrecs
-            vzi_diff2 = vzi["differences"][si:ei]
-            median = numpy.ma.median(vzi_diff2)
-            median_abs = numpy.ma.median(numpy.abs(vzi_diff2 - median))
-            if numpy.ma.is_masked(median) or numpy.ma.is_masked(median_abs):
-                continue
-            upr = median + (zfc*median_abs/0.6745)
-            lwr = median - (zfc*median_abs/0.6745)
-            upr = max([upr, lwr])
-            lwr = min([upr, lwr])
-            # cidx=2 for observations that fail the MAD test
-            fidx = numpy.ma.where((vzi_diff2 > upr) | (vzi_diff2 < lwr))[0]
-            cidx[si:ei][fidx] = 2
+        # get the upper and lower limits for each window, default is 13 days
+        diff_mask = numpy.ma.getmaskarray(vzi["differences"])
+        diff = numpy.ma.filled(vzi["differences"], numpy.nan)
+        upr, lwr = do_madfilter_limits(diff, window_nrecs, n_windows, zfc)
+        # windows with no valid differences have NaN limits and are skipped
+        done = numpy.isfinite(upr)
+        valid = done & ~diff_mask
+        with numpy.errstate(invalid="ignore"):
+            fail = valid & ((diff > upr) | (diff < lwr))
             # cidx=3 for observations that pass the MAD test
-            pidx = numpy.ma.where((vzi_diff2 >= lwr) & (vzi_diff2 <= upr))[0]
-            cidx[si:ei][pidx] = 3
-            vzi["Data"][si:ei] = numpy.ma.masked_where(((vzi_diff2 > upr) |
-                                                        (vzi_diff2 < lwr)),
-                                                        var["Data"][si:ei])
-            vzi["upr"][si:ei] = upr
-            vzi["lwr"][si:ei] = lwr
+            cidx[valid & (diff >= lwr) & (diff <= upr)] = 3
+        # cidx=2 for observations that fail the MAD test
+        cidx[fail] = 2
+        vzi["Data"][done] = numpy.ma.masked_where(fail | diff_mask, var["Data"])[done]
+        vzi["upr"][done] = upr[done]
+        vzi["lwr"][done] = lwr[done]
     # construct the data series for this value of zfc
     idx = numpy.where(inds["day"] == 1)[0]
     var[str(zfc)]["Data"][idx] = var[str(zfc)]["day"]["Data"][idx]
@@ -975,6 +970,39 @@ def do_madfilter_1(var, Fsd, info, code=24):
     var[str(zfc)]["Data"][idx] = var[str(zfc)]["night"]["Data"][idx]
     return {"cidx": cidx, "midx": midx, "var": var}
 
+def do_madfilter_limits(diff, window_nrecs, n_windows, zfc):
+    """
+    Purpose:
+     Return the upper and lower MAD filter limits for each window as arrays the
+     same length as the data.  All windows except the last one are the same size
+     so they are done together as the rows of a 2D array.
+     The limits are NaN for windows that contain no valid data.
+    Usage:
+     upr, lwr = pfp_ck.do_madfilter_limits(diff, window_nrecs, n_windows, zfc)
+     where diff is the second differences with missing data set to NaN
+           window_nrecs is the number of records in all but the last window
+           n_windows is the number of windows
+           zfc is the MAD filter z value
+    """
+    nrecs = len(diff)
+    upr = numpy.full(nrecs, numpy.nan)
+    lwr = numpy.full(nrecs, numpy.nan)
+    si = (n_windows - 1) * window_nrecs
+    blocks = [(si, nrecs, diff[si:].reshape(1, -1))]
+    if n_windows > 1:
+        blocks.append((0, si, diff[:si].reshape(n_windows - 1, window_nrecs)))
+    # all NaN windows are expected, they are skipped by the caller
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        for si, ei, diff2 in blocks:
+            median = numpy.nanmedian(diff2, axis=1, keepdims=True)
+            median_abs = numpy.nanmedian(numpy.abs(diff2 - median), axis=1, keepdims=True)
+            u = median + (zfc*median_abs/0.6745)
+            l = median - (zfc*median_abs/0.6745)
+            upr[si:ei] = numpy.broadcast_to(numpy.maximum(u, l), diff2.shape).ravel()
+            lwr[si:ei] = numpy.broadcast_to(numpy.minimum(u, l), diff2.shape).ravel()
+    return upr, lwr
+
 def do_madfilter_2(result, info, code=24):
     # second stage of spike rejection to deal with observations at the start and end of gaps
     inag = info["ApplyMADFilter"]["General"]
@@ -991,23 +1019,14 @@ def do_madfilter_2(result, info, code=24):
     # indices of points immediately before and after the gap start and end
     emidx = eidx - 1
     epidx = eidx + 1
-    # indices of differences at the start of gaps that are greater than the threshold
-    mdiff = numpy.ma.abs(var["Data"][eidx] - var["Data"][emidx])
-    mdiff_fidx = numpy.ma.where(mdiff > edge_threshold)[0]
-    # set cidx=2 to indicate this point fails the second stage check
-    cidx[eidx[mdiff_fidx]] = 2
-    # indices of differences at the start of gaps that are less than the threshold
-    mdiff_pidx = numpy.ma.where(numpy.ma.abs(var["Data"][eidx] - var["Data"][emidx]) <= edge_threshold)[0]
-    # set cidx=3 to indicate this point passes the second stage check
-    cidx[eidx[mdiff_pidx]] = 3
-    # indices of differences at the end of gaps that are greater than the threshold
-    pdiff_fidx = numpy.ma.where(numpy.ma.abs(var["Data"][epidx] - var["Data"][eidx]) > edge_threshold)[0]
-    # set cidx=2 to indicate this point fails the second stage check
-    cidx[eidx[pdiff_fidx]] = 2
-    # indices of differences at the end of gaps that are greater than the threshold
-    pdiff_pidx = numpy.ma.where(numpy.ma.abs(var["Data"][epidx] - var["Data"][eidx]) <= edge_threshold)[0]
-    # set cidx=3 to indicate this point passes the second stage check
-    cidx[eidx[pdiff_pidx]] = 3
+    # loop over the differences at the start and then the end of gaps, the
+    # masked differences neither pass nor fail
+    for diff in [numpy.ma.abs(var["Data"][eidx] - var["Data"][emidx]),
+                 numpy.ma.abs(var["Data"][epidx] - var["Data"][eidx])]:
+        # set cidx=2 to indicate this point fails the second stage check
+        cidx[eidx[numpy.ma.filled(diff > edge_threshold, False)]] = 2
+        # set cidx=3 to indicate this point passes the second stage check
+        cidx[eidx[numpy.ma.filled(diff <= edge_threshold, False)]] = 3
     # mask data points where cidx!=3, these observations have failed the first or second
     # stage spike check
     var["Data"] = numpy.ma.masked_where(cidx != 3, var["Data"])
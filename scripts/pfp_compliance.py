@@ -1,6 +1,6 @@
 # standard modules
 import copy
-import inspect
+import functools
 import logging
 import numbers
 import os
@@ -12,15 +12,16 @@ from configobj import ConfigObj
 import timezonefinder
 # PFP modules
 from scripts import constants as c
-from scripts import pfp_func_units
-from scripts import pfp_func_stats
-from scripts import pfp_func_transforms
 from scripts import pfp_gui
-from scripts import pfp_io
+from scripts import pfp_ts
 from scripts import pfp_utils
 
 logger = logging.getLogger("pfp_log")
 
+# file types allowed for the L1 input and output files
+_INPUT_EXTS = frozenset([".xls", ".xlsx", ".csv"])
+_OUTPUT_EXTS = frozenset([".nc"])
+
 #def CheckCFCompliance(nc_file_uri):
     #"""
     #Purpose:
@@ -147,14 +148,14 @@ def climatology_update_controlfile(cfg):
     Author: PRI
     Date: September 2020
     """
-    # copy the control file
-    cfg_original = copy.deepcopy(cfg)
+    # take a snapshot of the control file contents to see if they are changed
+    cfg_original = _section_to_dict(cfg)
     # check to see if we can load the update_control_files.txt standard control file
     try:
         # get the base path of script or Pyinstaller application
         base_path = pfp_utils.get_base_path()
         stdname = os.path.join(base_path, "controlfiles", "standard", "update_control_files.txt")
-        std = pfp_io.get_controlfilecontents(stdname, mode="quiet")
+        std = _load_std(stdname)[0]
     except Exception:
         ok = False
         msg = " Unable to load standard control file " + stdname
@@ -198,14 +199,14 @@ def cpd_barr_update_controlfile(cfg):
     Author: PRI
     Date: September 2020
     """
-    # copy the control file
-    cfg_original = copy.deepcopy(cfg)
+    # take a snapshot of the control file contents to see if they are changed
+    cfg_original = _section_to_dict(cfg)
     # check to see if we can load the update_control_files.txt standard control file
     try:
         # get the base path of script or Pyinstaller application
         base_path = pfp_utils.get_base_path()
         stdname = os.path.join(base_path, "controlfiles", "standard", "update_control_files.txt")
-        std = pfp_io.get_controlfilecontents(stdname, mode="quiet")
+        std = _load_std(stdname)[0]
     except Exception:
         ok = False
         msg = " Unable to load standard control file " + stdname
@@ -251,14 +252,14 @@ def cpd_mchugh_update_controlfile(cfg):
     Author: PRI
     Date: September 2020
     """
-    # copy the control file
-    cfg_original = copy.deepcopy(cfg)
+    # take a snapshot of the control file contents to see if they are changed
+    cfg_original = _section_to_dict(cfg)
     # check to see if we can load the update_control_files.txt standard control file
     try:
         # get the base path of script or Pyinstaller application
         base_path = pfp_utils.get_base_path()
         stdname = os.path.join(base_path, "controlfiles", "standard", "update_control_files.txt")
-        std = pfp_io.get_controlfilecontents(stdname, mode="quiet")
+        std = _load_std(stdname)[0]
     except Exception:
         ok = False
         msg = " Unable to load standard control file " + stdname
@@ -304,14 +305,14 @@ def cpd_mcnew_update_controlfile(cfg):
     Author: PRI
     Date: May 2021
     """
-    # copy the control file
-    cfg_original = copy.deepcopy(cfg)
+    # take a snapshot of the control file contents to see if they are changed
+    cfg_original = _section_to_dict(cfg)
     # check to see if we can load the update_control_files.txt standard control file
     try:
         # get the base path of script or Pyinstaller application
         base_path = pfp_utils.get_base_path()
         stdname = os.path.join(base_path, "controlfiles", "standard", "update_control_files.txt")
-        std = pfp_io.get_controlfilecontents(stdname, mode="quiet")
+        std = _load_std(stdname)[0]
     except Exception:
         ok = False
         msg = " Unable to load standard control file " + stdname
@@ -357,8 +358,8 @@ def mpt_update_controlfile(cfg):
     Author: PRI
     Date: September 2020
     """
-    # copy the control file
-    cfg_original = copy.deepcopy(cfg)
+    # take a snapshot of the control file contents to see if they are changed
+    cfg_original = _section_to_dict(cfg)
     # initialise the return logical
     ok = True
     # force the level to "mpt"
@@ -368,7 +369,7 @@ def mpt_update_controlfile(cfg):
         # get the base path of script or Pyinstaller application
         base_path = pfp_utils.get_base_path()
         stdname = os.path.join(base_path, "controlfiles", "standard", "update_control_files.txt")
-        std = pfp_io.get_controlfilecontents(stdname, mode="quiet")
+        std = _load_std(stdname)[0]
     except Exception:
         ok = False
         msg = " Unable to load standard control file " + stdname
@@ -410,14 +411,14 @@ def concatenate_update_controlfile(cfg):
     Author: PRI
     Date: February 2020
     """
-    # copy the control file
-    cfg_original = copy.deepcopy(cfg)
+    # take a snapshot of the control file contents to see if they are changed
+    cfg_original = _section_to_dict(cfg)
     # check to see if we can load the update_control_files.txt standard control file
     try:
         # get the base path of script or Pyinstaller application
         base_path = pfp_utils.get_base_path()
         stdname = os.path.join(base_path, "controlfiles", "standard", "update_control_files.txt")
-        std = pfp_io.get_controlfilecontents(stdname, mode="quiet")
+        std = _load_std(stdname)[0]
     except Exception:
         ok = False
         msg = " Unable to load standard control file " + stdname
@@ -531,6 +532,11 @@ def ParseConcatenateControlFile(cf):
     info["RemoveIntermediateSeries"] = {"KeepIntermediateSeries": opt, "not_output": []}
     return info
 
+def _section_to_dict(section):
+    """ Return a control file section as nested dictionaries, the values are
+        strings so they are shared rather than copied."""
+    return {k: _section_to_dict(v) if isinstance(v, dict) else v for k, v in section.items()}
+
 def ParseL1ControlFile(cf):
     """
     Purpose:
@@ -544,7 +550,7 @@ def ParseL1ControlFile(cf):
               "read_excel": {}}
     l1ire = l1_info["read_excel"]
     # copy the files section from the control file
-    l1ire["Files"] = copy.deepcopy(cf["Files"])
+    l1ire["Files"] = _section_to_dict(cf["Files"])
     l1ire["Files"]["file_name"] = os.path.join(cf["Files"]["file_path"], cf["Files"]["in_filename"])
     l1ire["Files"]["in_headerrow"] = cf["Files"]["in_headerrow"]
     l1ire["Files"]["in_firstdatarow"] = cf["Files"]["in_firstdatarow"]
@@ -554,11 +560,11 @@ def ParseL1ControlFile(cf):
         os.makedirs(plot_path)
     l1ire["Files"]["plot_path"] = plot_path
     # get the global attributes
-    l1ire["Global"] = copy.deepcopy(cf["Global"])
+    l1ire["Global"] = _section_to_dict(cf["Global"])
     # get the options section
-    l1ire["Options"] = copy.deepcopy(cf["Options"])
+    l1ire["Options"] = _section_to_dict(cf["Options"])
     # get the variables
-    l1ire["Variables"] = copy.deepcopy(cf["Variables"])
+    l1ire["Variables"] = _section_to_dict(cf["Variables"])
     return l1_info
 
 def ParseL3ControlFile(cfg, ds):
@@ -716,6 +722,32 @@ def parse_variable_attributes(attributes):
         attributes[attr] = value
     return attributes
 
+@functools.lru_cache(maxsize=16)
+def _parse_std(std_name, mtime_ns, size):
+    """ Parse a standard control file, the file modification time and size are
+        part of the cache key so an edited file is parsed again."""
+    std = ConfigObj(std_name, indent_type="    ", list_values=False, write_empty_values=True)
+    std_labels = ()
+    if "Variables" in std:
+        std_labels = tuple(sorted(list(std["Variables"].keys())))
+    return std, std_labels
+
+def _load_std(std_name):
+    """
+    Purpose:
+     Return the parsed standard control file and its sorted variable labels.
+     The parsed file is cached and only re-read when the file on disk changes.
+    Usage:
+     std, std_labels = _load_std(std_name)
+     where std_name is the path to the standard control file
+           std is the standard control file as a ConfigObj
+           std_labels is a sorted tuple of the keys in std["Variables"]
+    Side effects:
+     The returned objects are shared between calls and must not be modified.
+    """
+    stat = os.stat(std_name)
+    return _parse_std(std_name, stat.st_mtime_ns, stat.st_size)
+
 def check_batch_controlfile(self):
     """
     Purpose:
@@ -745,8 +777,7 @@ def check_l1_controlfile(cfg):
         cfg_labels = sorted(list(cfg["Variables"].keys()))
         base_path = pfp_utils.get_base_path()
         std_name = os.path.join(base_path, "controlfiles", "standard", "check_l1_controlfile.txt")
-        std = ConfigObj(std_name, indent_type="    ", list_values=False, write_empty_values=True)
-        std_labels = sorted(list(std["Variables"].keys()))
+        std, std_labels = _load_std(std_name)
         # initialise the messages dictionary
         messages = {"ERROR":[], "WARNING": [], "INFO": [], "DEBUG": [], "RESULT": "ignore"}
         # check the files section
@@ -754,24 +785,37 @@ def check_l1_controlfile(cfg):
         # check the global attributes section
         l1_check_global_attributes(cfg, std, messages)
         # check variables whose name exactly matches an entry in the settings/l1.txt control file
-        done = []
-        label_matches = [l for l in cfg_labels if l in std_labels]
+        done = set()
+        std_label_set = set(std_labels)
+        label_matches = [l for l in cfg_labels if l in std_label_set]
         for cfg_label in label_matches:
             std_label = cfg_label
             # check variable 'Attr' section
             l1_check_variables_sections(cfg, std, cfg_label, std_label, messages)
-            # append this variable name to the done list
-            done.append(cfg_label)
+            # add this variable name to the done set
+            done.add(cfg_label)
         # check variables where the first characters of the name match an entry in settings/l1.txt
-        cfg_labels = sorted(list(cfg["Variables"].keys()))
+        # NOTE: the checks above change variable attributes but do not add or remove
+        #       variables so cfg_labels is still current
+        # the shortest matching prefix is also the first in sorted order so we
+        # only need to look up the prefixes of each name, shortest first
+        std_label_lengths = sorted(set([len(l) for l in std_labels]))
+        prefix_matches = {}
+        for cfg_label in cfg_labels:
+            if cfg_label in done:
+                continue
+            for lsl in std_label_lengths:
+                if lsl > len(cfg_label):
+                    break
+                if cfg_label[:lsl] in std_label_set:
+                    prefix_matches.setdefault(cfg_label[:lsl], []).append(cfg_label)
+                    break
         for std_label in std_labels:
-            lsl = len(std_label)
-            label_matches = [l for l in cfg_labels if l[:min([len(l),lsl])] == std_label and l not in done]
-            for cfg_label in label_matches:
+            for cfg_label in prefix_matches.get(std_label, []):
                 # check variable 'Attr' section
                 l1_check_variables_sections(cfg, std, cfg_label, std_label, messages)
-                # append this variable name to the done list
-                done.append(cfg_label)
+                # add this variable name to the done set
+                done.add(cfg_label)
         # check for duplicate netCDF variable labels
         l1_check_nc_labels(cfg, messages)
         # check for duplicate input variable labels
@@ -990,8 +1034,8 @@ def check_l3_files(cfg, messages):
         # check the output file type
         if "out_filename" in cfg["Files"]:
             file_name = cfg["Files"]["out_filename"]
-            file_parts = os.path.splitext(file_name)
-            if (file_parts[-1].lower() in [".nc"]):
+            file_ext = os.path.splitext(file_name)[1].lower()
+            if file_ext in _OUTPUT_EXTS:
                 pass
             else:
                 msg = "Files: " + file_name + " doesn't end with .nc"
@@ -1302,12 +1346,15 @@ def display_messages_interactive(messages, mode="Close"):
 def l1_check_files(cfg, std, messages):
     # check the Files section exists
     if ("Files" in cfg):
+        # names of the files in file_path, read once rather than checking each file
+        existing = set()
         # check file_path is in the Files section
         if "file_path" in cfg["Files"]:
             file_path = cfg["Files"]["file_path"]
             # check file_path directory exists
             if os.path.isdir(file_path):
-                pass
+                with os.scandir(file_path) as entries:
+                    existing = {e.name for e in entries if e.is_file()}
             else:
                 msg = "Files: " + file_path + " is not a directory"
                 messages["ERROR"].append(msg)
@@ -1319,11 +1366,13 @@ def l1_check_files(cfg, std, messages):
             file_names = cfg["Files"]["in_filename"]
             file_names = file_names.split(",")
             for file_name in file_names:
-                file_parts = os.path.splitext(file_name)
+                file_ext = os.path.splitext(file_name)[1].lower()
                 # check the file type is supported
-                if (file_parts[-1].lower() in  [".xls", ".xlsx", ".csv"]):
-                    file_uri = os.path.join(file_path, file_name)
-                    if os.path.isfile(file_uri):
+                if file_ext in _INPUT_EXTS:
+                    if file_name in existing:
+                        pass
+                    elif os.path.isfile(os.path.join(file_path, file_name)):
+                        # names that differ only in case or include a sub-directory
                         pass
                     else:
                         msg = "Files: " + file_name + " not found"
@@ -1355,8 +1404,8 @@ def l1_check_files(cfg, std, messages):
         # check the output file type
         if "out_filename" in cfg["Files"]:
             file_name = cfg["Files"]["out_filename"]
-            file_parts = os.path.splitext(file_name)
-            if (file_parts[-1].lower() in [".nc"]):
+            file_ext = os.path.splitext(file_name)[1].lower()
+            if file_ext in _OUTPUT_EXTS:
                 pass
             else:
                 msg = "Files: " + file_name + " doesn't end with .nc"
@@ -1381,42 +1430,46 @@ def l1_check_global_attributes(cfg, std, messages):
 def l1_check_global_required(cfg, std, messages):
     # check the global attributes
     required = std["Global"]["Required"]
-    cfg_global = sorted(list(cfg["Global"].keys()))
+    cfg_gattrs = cfg["Global"]
+    cfg_global = set(cfg_gattrs.keys())
     # check the required global attributes are present
     for item in required:
         if item not in cfg_global:
             msg = "Global: " + item + " not in section (required)"
             messages["ERROR"].append(msg)
     # check time step is present and makes sense
-    if "time_step" in cfg["Global"]:
+    if "time_step" in cfg_gattrs:
         try:
-            ts = int(cfg["Global"]["time_step"])
+            ts = int(cfg_gattrs["time_step"])
         except ValueError:
             msg = "Global: 'time_step' is not a number"
             messages["ERROR"].append(msg)
-        if ts not in [15, 20, 30, 60]:
-            msg = "Global : 'time_step' must be 15, 20, 30 or 60"
-            messages["ERROR"].append(msg)
+        else:
+            if ts not in [15, 20, 30, 60]:
+                msg = "Global : 'time_step' must be 15, 20, 30 or 60"
+                messages["ERROR"].append(msg)
     # check latitude is present and makes sense
-    if "latitude" in cfg["Global"]:
+    if "latitude" in cfg_gattrs:
         try:
-            lat = float(cfg["Global"]["latitude"])
-            if lat < -90.0 or lat > 90.0:
-                msg = "Global: 'latitude' must be between -90 and 90"
-                messages["ERROR"].append(msg)
+            lat = float(cfg_gattrs["latitude"])
         except ValueError:
             msg = "Global: 'latitude' is not a number"
             messages["ERROR"].append(msg)
+        else:
+            if not -90.0 <= lat <= 90.0:
+                msg = "Global: 'latitude' must be between -90 and 90"
+                messages["ERROR"].append(msg)
     # check longitude is present and makes sense
-    if "longitude" in cfg["Global"]:
+    if "longitude" in cfg_gattrs:
         try:
-            lon = float(cfg["Global"]["longitude"])
-            if lon < -180.0 or lat > 180.0:
-                msg = "Global: 'longitude' must be between -180 and 180"
-                messages["ERROR"].append(msg)
+            lon = float(cfg_gattrs["longitude"])
         except ValueError:
             msg = "Global: 'longitude' is not a number"
             messages["ERROR"].append(msg)
+        else:
+            if not -180.0 <= lon <= 180.0:
+                msg = "Global: 'longitude' must be between -180 and 180"
+                messages["ERROR"].append(msg)
     return
 def l1_check_global_forced(cfg, std, messages):
     forced = std["Global"]["Forced"]
@@ -1442,7 +1495,7 @@ def l1_check_global_forced(cfg, std, messages):
     return
 def l1_check_global_recommended(cfg, std, messages):
     recommended = std["Global"]["Recommended"]
-    cfg_global = sorted(list(cfg["Global"].keys()))
+    cfg_global = set(cfg["Global"].keys())
     # check recommended global attributes
     for item in recommended:
         if item not in cfg_global:
@@ -1484,19 +1537,6 @@ def l1_check_variables_sections(cfg, std, cfg_label, std_label, messages):
     else:
         msg = cfg_label + ": 'Attr' section missing"
         messages["ERROR"].append(msg)
-    # check the file extension, only xls, xlsx or csv allowed
-    file_parts = os.path.splitext(cfg["Files"]["in_filename"])
-    if ((file_parts[-1].lower() == "xls") or
-        (file_parts[-1].lower() == "xlsx")):
-        if (("xl" not in var_keys) or ("Function" not in var_keys)):
-            msg = cfg_label + ": 'xl' section missing"
-            messages["ERROR"].append(msg)
-    elif (file_parts[-1].lower() == "csv"):
-        if (("csv" not in var_keys) or ("Function" not in var_keys)):
-            msg = cfg_label + ": 'csv' section missing"
-            messages["ERROR"].append(msg)
-    else:
-        pass
     # check any use of Function
     if "Function" in var_keys:
         # check 'func' key is in the 'Function' section
@@ -1504,19 +1544,8 @@ def l1_check_variables_sections(cfg, std, cfg_label, std_label, messages):
             # get the function name
             function_string = cfg["Variables"][cfg_label]["Function"]["func"]
             function_name = function_string.split("(")[0]
-            # get a list of function names in pfp_func_units and pfp_func_stats
-            implemented_func_units = [name for name,data in
-                                      inspect.getmembers(pfp_func_units,
-                                                         inspect.isfunction)]
-            implemented_func_stats = [name for name,data in
-                                      inspect.getmembers(pfp_func_stats,
-                                                         inspect.isfunction)]
-            implemented_func_transforms = [name for name,data in
-                                           inspect.getmembers(pfp_func_transforms,
-                                                              inspect.isfunction)]
-            implemented_functions = (implemented_func_units +
-                                     implemented_func_stats +
-                                     implemented_func_transforms)
+            # get the functions in pfp_func_units, pfp_func_stats and pfp_func_transforms
+            implemented_functions = pfp_ts.get_implemented_functions()
             # check the function name is implemented
             if function_name not in implemented_functions:
                 msg = " Skipping " + cfg_label + " (function " + function_name
@@ -1529,7 +1558,7 @@ def l1_check_variables_sections(cfg, std, cfg_label, std_label, messages):
                 if function_name in ["Linear"]:
                     nargs = 1
                 for item in function_args[:nargs]:
-                    if item not in list(cfg["Variables"].keys()):
+                    if item not in cfg["Variables"]:
                         msg = " Skipping " + cfg_label + " (function argument '"
                         msg += item + "' not found)"
                         messages["ERROR"].append(msg)
@@ -1639,7 +1668,7 @@ def l1_check_irga_only(cfg, irga_only_labels, messages):
     open_path_irgas = list(c.instruments["irgas"]["open_path"].keys())
     closed_path_irgas = list(c.instruments["irgas"]["closed_path"].keys())
     known_irgas = open_path_irgas + closed_path_irgas
-    cfg_labels = sorted(list(cfg["Variables"].keys()))
+    cfg_labels = set(cfg["Variables"].keys())
     for label in list(irga_only_labels):
         if label not in cfg_labels:
             irga_only_labels.remove(label)
@@ -1676,7 +1705,7 @@ def l1_check_sonic_only(cfg, sonic_only_labels, messages):
     if len(sonic_only_labels) == 0:
         return
     known_sonics = list(c.instruments["sonics"].keys())
-    cfg_labels = sorted(list(cfg["Variables"].keys()))
+    cfg_labels = set(cfg["Variables"].keys())
     for label in list(sonic_only_labels):
         if label not in cfg_labels:
             sonic_only_labels.remove(label)
@@ -1729,7 +1758,7 @@ def l1_check_sonic_irga(cfg, sonic_irga_labels, messages):
     closed_path_irgas = list(c.instruments["irgas"]["closed_path"].keys())
     known_irgas = open_path_irgas + closed_path_irgas
     known_sonics = list(c.instruments["sonics"].keys())
-    cfg_labels = sorted(list(cfg["Variables"].keys()))
+    cfg_labels = set(cfg["Variables"].keys())
     for sonic_irga_label in list(sonic_irga_labels):
         if sonic_irga_label not in cfg_labels:
             sonic_irga_labels.remove(sonic_irga_label)
@@ -1830,20 +1859,18 @@ def l1_check_variables_height(cfg, cfg_label, messages):
 def l1_check_variables_statistic_type(cfg, std, cfg_label, std_label, messages):
     cfg_attr = cfg["Variables"][cfg_label]["Attr"]
     std_var = std["Variables"][std_label]
-    statistic_types = sorted(list(std_var.keys()))
     cfg_stat_type = cfg_attr["statistic_type"]
-    if cfg_stat_type not in statistic_types:
+    if cfg_stat_type not in std_var:
         msg = cfg_label + ": unrecognised statistic_type (" + cfg_stat_type + ")"
         messages["ERROR"].append(msg)
     return
 def l1_check_variables_units(cfg, std, cfg_label, std_label, messages):
     cfg_attr = cfg["Variables"][cfg_label]["Attr"]
     cfg_stat_type = cfg_attr["statistic_type"]
-    if cfg_stat_type in std["Variables"][std_label]:
-        std_stat_type = std["Variables"][std_label][cfg_stat_type]
-        std_units = sorted(list(std_stat_type.keys()))
+    std_stat_type = std["Variables"][std_label].get(cfg_stat_type)
+    if std_stat_type is not None:
         cfg_units = cfg_attr["units"]
-        if cfg_units not in std_units:
+        if cfg_units not in std_stat_type:
             msg = cfg_label + ": unrecognised units (" + cfg_units + ")"
             messages["ERROR"].append(msg)
     return
@@ -1851,8 +1878,8 @@ def l1_check_variables_standard_name(cfg, std, cfg_label, std_label, messages):
     cfg_attr = cfg["Variables"][cfg_label]["Attr"]
     cfg_units = cfg_attr["units"]
     cfg_stat_type = cfg_attr["statistic_type"]
-    if cfg_stat_type in std["Variables"][std_label]:
-        std_stat_type = std["Variables"][std_label][cfg_stat_type]
+    std_stat_type = std["Variables"][std_label].get(cfg_stat_type)
+    if std_stat_type is not None:
         if cfg_units in std_stat_type:
             if (("standard_name" in cfg_attr) and
                 ("standard_name" not in std_stat_type[cfg_units])):
@@ -1870,21 +1897,22 @@ def l1_make_variables_attributes_consistent(cfg, std, cfg_label, std_label, mess
     cfg_attr = cfg["Variables"][cfg_label]["Attr"]
     cfg_units = cfg_attr["units"]
     cfg_stat_type = cfg_attr["statistic_type"]
-    if cfg_stat_type in std["Variables"][std_label]:
-        std_stat_type = std["Variables"][std_label][cfg_stat_type]
+    std_stat_type = std["Variables"][std_label].get(cfg_stat_type)
+    if std_stat_type is not None:
         if cfg_units in std_stat_type:
-            for item in std_stat_type[cfg_units]:
+            std_attr = std_stat_type[cfg_units]
+            for item in std_attr:
                 if (item not in cfg_attr):
                     # attribute not found so add it
                     msg = cfg_label + ": attribute (" + item + ") not found, adding..."
                     messages["WARNING"].append(msg)
-                    cfg_attr[item] = std_stat_type[cfg_units][item]
-                elif (cfg_attr[item] != std_stat_type[cfg_units][item]):
+                    cfg_attr[item] = std_attr[item]
+                elif (cfg_attr[item] != std_attr[item]):
                     # cfg attribute not the same as the std attribute, replace it
                     msg = cfg_label + ": invalid " + item + " (" + cfg_attr[item] + ")"
                     msg += ", replacing..."
                     messages["WARNING"].append(msg)
-                    cfg_attr[item] = std_stat_type[cfg_units][item]
+                    cfg_attr[item] = std_attr[item]
                 else:
                     pass
         else:
@@ -1906,15 +1934,15 @@ def l1_update_controlfile(cfg):
     Author: PRI
     Date: February 2020
     """
-    # copy the control file
-    cfg_original = copy.deepcopy(cfg)
+    # take a snapshot of the control file contents to see if they are changed
+    cfg_original = _section_to_dict(cfg)
     # check to see if we can load the update_control_files.txt standard control file
     try:
         # get the base path of script or Pyinstaller application
         base_path = pfp_utils.get_base_path()
         stdname = os.path.join(base_path, "controlfiles", "standard",
                                "update_control_files.txt")
-        std = pfp_io.get_controlfilecontents(stdname, mode="quiet")
+        std = _load_std(stdname)[0]
     except Exception:
         ok = False
         msg = " Unable to load standard control file " + stdname
@@ -1924,7 +1952,7 @@ def l1_update_controlfile(cfg):
         base_path = pfp_utils.get_base_path()
         chkname = os.path.join(base_path, "controlfiles", "standard",
                                "check_l1_controlfile.txt")
-        chk = pfp_io.get_controlfilecontents(chkname, mode="quiet")
+        chk = _load_std(chkname)[0]
     except Exception:
         ok = False
         msg = " Unable to load standard control file " + chkname
@@ -2317,8 +2345,8 @@ def l2_check_files(cfg, messages):
         # check the output file type
         if "out_filename" in cfg["Files"]:
             file_name = cfg["Files"]["out_filename"]
-            file_parts = os.path.splitext(file_name)
-            if (file_parts[-1].lower() in [".nc"]):
+            file_ext = os.path.splitext(file_name)[1].lower()
+            if file_ext in _OUTPUT_EXTS:
                 pass
             else:
                 msg = "Files: " + file_name + " doesn't end with .nc"
@@ -2352,14 +2380,14 @@ def l2_update_controlfile(cfg):
     Author: PRI
     Date: February 2020
     """
-    # copy the control file
-    cfg_original = copy.deepcopy(cfg)
+    # take a snapshot of the control file contents to see if they are changed
+    cfg_original = _section_to_dict(cfg)
     # check to see if we can load the update_control_files.txt standard control file
     try:
         # get the base path of script or Pyinstaller application
         base_path = pfp_utils.get_base_path()
         stdname = os.path.join(base_path, "controlfiles", "standard", "update_control_files.txt")
-        std = pfp_io.get_controlfilecontents(stdname, mode="quiet")
+        std = _load_std(stdname)[0]
     except Exception:
         ok = False
         msg = " Unable to load standard control file " + stdname
@@ -2592,14 +2620,14 @@ def l3_update_controlfile(cfg):
     Author: PRI
     Date: February 2020
     """
-    # get a copy of the original control file object
-    cfg_original = copy.deepcopy(cfg)
+    # take a snapshot of the control file contents to see if they are changed
+    cfg_original = _section_to_dict(cfg)
     # check to see if we can load the update_control_files.txt standard control file
     try:
         # get the base path of script or Pyinstaller application
         base_path = pfp_utils.get_base_path()
         stdname = os.path.join(base_path, "controlfiles", "standard", "update_control_files.txt")
-        std = pfp_io.get_controlfilecontents(stdname, mode="quiet")
+        std = _load_std(stdname)[0]
     except Exception:
         ok = False
         msg = " Unable to load standard control file " + stdname
@@ -2729,14 +2757,14 @@ def l4_update_controlfile(cfg):
     Author: PRI
     Date: June 2020
     """
-    # get a copy of the original control file object
-    cfg_original = copy.deepcopy(cfg)
+    # take a snapshot of the control file contents to see if they are changed
+    cfg_original = _section_to_dict(cfg)
     # check to see if we can load the update_control_files.txt standard control file
     try:
         # get the base path of script or Pyinstaller application
         base_path = pfp_utils.get_base_path()
         stdname = os.path.join(base_path, "controlfiles", "standard", "update_control_files.txt")
-        std = pfp_io.get_controlfilecontents(stdname, mode="quiet")
+        std = _load_std(stdname)[0]
     except Exception:
         ok = False
         msg = " Unable to load standard control file " + stdname
@@ -2782,14 +2810,14 @@ def l5_update_controlfile(cfg):
     Author: PRI
     Date: June 2020
     """
-    # get a copy of the original control file object
-    cfg_original = copy.deepcopy(cfg)
+    # take a snapshot of the control file contents to see if they are changed
+    cfg_original = _section_to_dict(cfg)
     # check to see if we can load the update_control_files.txt standard control file
     try:
         # get the base path of script or Pyinstaller application
         base_path = pfp_utils.get_base_path()
         stdname = os.path.join(base_path, "controlfiles", "standard", "update_control_files.txt")
-        std = pfp_io.get_controlfilecontents(stdname, mode="quiet")
+        std = _load_std(stdname)[0]
     except Exception:
         ok = False
         msg = " Unable to load standard control file " + stdname
@@ -2836,14 +2864,14 @@ def l6_update_controlfile(cfg):
     Author: PRI
     Date: June 2020
     """
-    # get a copy of the original control file object
-    cfg_original = copy.deepcopy(cfg)
+    # take a snapshot of the control file contents to see if they are changed
+    cfg_original = _section_to_dict(cfg)
     # check to see if we can load the update_control_files.txt standard control file
     try:
         # get the base path of script or Pyinstaller application
         base_path = pfp_utils.get_base_path()
         stdname = os.path.join(base_path, "controlfiles", "standard", "update_control_files.txt")
-        std = pfp_io.get_controlfilecontents(stdname, mode="quiet")
+        std = _load_std(stdname)[0]
     except Exception:
         ok = False
         msg = " Unable to load standard control file " + stdname
@@ -2918,8 +2946,8 @@ def l6_check_files(cfg, messages):
         # check the output file type
         if "out_filename" in cfg["Files"]:
             file_name = cfg["Files"]["out_filename"]
-            file_parts = os.path.splitext(file_name)
-            if (file_parts[-1].lower() in [".nc"]):
+            file_ext = os.path.splitext(file_name)[1].lower()
+            if file_ext in _OUTPUT_EXTS:
                 pass
             else:
                 msg = "Files: " + file_name + " doesn't end with .nc"
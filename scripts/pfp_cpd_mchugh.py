@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 
 # standard modules
-import datetime
 import logging
 import os
 import time
@@ -15,7 +14,6 @@ from scipy import stats
 import statsmodels.api as sm
 #import statsmodels.formula.api as sm
 # PFP modules
-from scripts import constants as c
 from scripts import pfp_io
 from scripts import pfp_utils
 
@@ -307,42 +305,36 @@ def CPD_run(cf):
     ds = pfp_io.NetCDFRead(file_in)
     if ds.info["returncodes"]["value"] != 0: return
     ts = int(float(ds.root["Attributes"]["time_step"]))
-    # get the datetime
-    dt = ds.root["Variables"]["DateTime"]["Data"]
+    # get the datetime as a DatetimeIndex so the shift and year below are done
+    # on the whole index rather than on each Python datetime in turn
+    dt = pd.DatetimeIndex(ds.root["Variables"]["DateTime"]["Data"])
     # adjust the datetime so that the last time period in a year is correctly assigned.
     # e.g. last period for 2013 is 2014-01-01 00:00, here we make the year 2013
-    dt = dt - datetime.timedelta(minutes=ts)
-    # now get the data
-    d = {}
-    f = {}
-    for item in list(names.keys()):
+    dt = dt - pd.Timedelta(minutes=ts)
+    # now get the data, the columns are copied into a single 2D array so the
+    # data frame is built from one block
+    items = list(names.keys())
+    data = np.empty((len(dt), len(items)))
+    # set data to NaNs if target (Fco2) flag is not 0 or driver (Fsd, ustar, Ta)
+    # flag does not end in 0 (i.e. allow gap filled drivers but only observed target)
+    # create a conditional index, True will be not OK
+    cidx = np.zeros(len(dt), dtype=bool)
+    for n, item in enumerate(items):
         msg = " CPD (McHugh): Using variable " + names[item] + " for " + item
         logger.info(msg)
         var = pfp_utils.GetVariable(ds, names[item])
-        d[item] = np.ma.filled(var["Data"], np.nan)
-        f[item] = var["Flag"]
-    # set data to NaNs if target (Fco2) flag is not 0 or driver (Fsd, ustar, Ta)
-    # flag does not end in 0 (i.e. allow gap filled drivers but only observed target)
-    # create a conditional index, 0 will be OK, 1 will be not OK
-    cidx = np.zeros(len(dt))
-    # loop over items in the flag dictionary
-    for item in list(f.keys()):
+        data[:, n] = np.ma.filled(var["Data"], np.nan)
         # check to see if we are using the target ...
         if item == "Fco2":
             # target must have a flag == 0 i.e. an observation
-            idx = np.where(f[item] != 0)[0]
-            cidx[idx] = 1
+            cidx |= var["Flag"] != 0
         else:
             # drivers must have a flag that ends in 0 i.e. can be gap filled
-            idx = np.where(np.mod(f[item], 10) != 0)[0]
-            cidx[idx] = 1
-    # loop over the data dictionary and set rejected data to NaN
-    for item in list(d.keys()):
-        d[item][cidx == 1] = np.nan
-    d["Year"] = np.array([ldt.year for ldt in dt])
-    df = pd.DataFrame(d, index=dt)
-    # replace missing values with NaN
-    df.replace(c.missing_value, np.nan)
+            cidx |= np.mod(var["Flag"], 10) != 0
+    # set rejected data to NaN, missing values are already NaN
+    data[cidx, :] = np.nan
+    df = pd.DataFrame(data, index=dt, columns=items)
+    df["Year"] = dt.year
     # Build dictionary of additional configs
     d={}
     d["radiation_threshold"] = int(cf["Options"]["Fsd_threshold"])
@@ -1,7 +1,7 @@
 # standard Python modules
+import concurrent.futures
 import copy
 import datetime
-import glob
 import logging
 import os
 import subprocess
@@ -40,67 +40,118 @@ def GapFillUsingMDS(ds, l5_info, called_by):
     td = tmp_dir.name
     for item in ["input", "output", "log"]:
         os.makedirs(os.path.join(tmp_dir.name, item))
-    # define the MDS input file location
-    in_base_path = os.path.join(td, "input")
-    # get a list of CSV files in the input directory
-    in_path_files = glob.glob(os.path.join(in_base_path, "*.csv"))
-    # and clean them out
-    for in_file in in_path_files:
-        if os.path.exists(in_file):
-            os.remove(in_file)
-    # define the MDS output file location
-    out_base_path = os.path.join(td, "output", "")
-    # get a list of CSV files in the output directory
-    out_path_files = glob.glob(os.path.join(out_base_path, "*.csv"))
-    # and clean them out
-    for out_file in out_path_files:
-        if os.path.exists(out_file):
-            os.remove(out_file)
     # get some useful odds and ends
     ldt = pfp_utils.GetVariable(ds, "DateTime")
     first_year = ldt["Data"][0].year
     last_year = ldt["Data"][-2].year
-    # now loop over the series to be gap filled using MDS
-    # open a log file for the MDS C code output
-    log_file_path = os.path.join(td, "log", "mds.log")
-    mdslogfile = open(log_file_path, "w")
-    for fig_num, mds_label in enumerate(l5im["outputs"].keys()):
-        logger.info(" Doing MDS gap filling for %s", l5im["outputs"][mds_label]["target"])
-        l5im["outputs"][mds_label]["out_base_path"] = out_base_path
-        l5im["outputs"][mds_label]["time_step"] = ts
-        # make the output file name
-        out_name = site_name+"_"+level+"_"+mds_label+"_mds.csv"
-        out_file_path = os.path.join(out_base_path, out_name)
-        # first, we write the yearly CSV input files
-        l5im["outputs"][mds_label]["in_file_paths"] = []
-        for current_year in range(first_year, last_year+1):
-            in_name = nc_name.replace(".nc","_"+str(current_year)+"_MDS.csv")
-            #in_name = str(current_year)+".csv"
-            in_file_path = os.path.join(in_base_path, in_name)
-            data, header, fmt = gfMDS_make_data_array(ds, current_year, l5im["outputs"][mds_label])
-            numpy.savetxt(in_file_path, data, header=header, delimiter=",", comments="", fmt=fmt)
-            l5im["outputs"][mds_label]["in_file_paths"].append(in_file_path)
-        # then we construct the MDS C code command options list
-        cmd = gfMDS_make_cmd_string(l5im, mds_label)
-        # then we spawn a subprocess for the MDS C code
-        subprocess.call(cmd, stdout=mdslogfile)
-        mds_out_file = os.path.join(td, "output", "mds.csv")
-        os.rename(mds_out_file, out_file_path)
-        gfMDS_get_mds_output(ds, mds_label, out_file_path, l5_info, called_by)
-        # mask long gaps, if requested
-        gfMDS_mask_long_gaps(ds, mds_label, l5_info, called_by)
-        # plot the MDS results
-        target = l5im["outputs"][mds_label]["target"]
-        drivers = l5im["outputs"][mds_label]["drivers"]
-        title = site_name+' : Comparison of tower and MDS data for '+target
-        pd = gfMDS_initplot(site_name=site_name, label=target, fig_num=fig_num,
-                            title=title, nDrivers=len(drivers), show_plots=True)
-        gfMDS_plot(pd, ds, mds_label, l5_info, called_by)
-
-    # close the log file
-    mdslogfile.close()
+    # outputs that use an earlier MDS output as the target or a driver have to wait
+    # until that output is in the data structure, so the outputs are split into
+    # batches of independent outputs and each batch is done before the next
+    mds_labels = list(l5im["outputs"].keys())
+    for batch in gfMDS_get_batches(l5im, mds_labels):
+        # loop over the series in this batch and write the input files
+        cmds = []
+        log_file_paths = []
+        for mds_label in batch:
+            logger.info(" Doing MDS gap filling for %s", l5im["outputs"][mds_label]["target"])
+            # each output gets its own input and output directories so that the
+            # MDS C code can be run for all outputs in the batch at the same time
+            in_base_path = os.path.join(td, "input", mds_label)
+            out_base_path = os.path.join(td, "output", mds_label, "")
+            os.makedirs(in_base_path)
+            os.makedirs(out_base_path)
+            l5im["outputs"][mds_label]["out_base_path"] = out_base_path
+            l5im["outputs"][mds_label]["time_step"] = ts
+            # first, we write the yearly CSV input files
+            l5im["outputs"][mds_label]["in_file_paths"] = []
+            for current_year in range(first_year, last_year+1):
+                in_name = nc_name.replace(".nc","_"+str(current_year)+"_MDS.csv")
+                #in_name = str(current_year)+".csv"
+                in_file_path = os.path.join(in_base_path, in_name)
+                data, header, fmt = gfMDS_make_data_array(ds, current_year, l5im["outputs"][mds_label])
+                numpy.savetxt(in_file_path, data, header=header, delimiter=",", comments="", fmt=fmt)
+                l5im["outputs"][mds_label]["in_file_paths"].append(in_file_path)
+            # then we construct the MDS C code command options list
+            cmds.append(gfMDS_make_cmd_string(l5im, mds_label))
+            log_file_paths.append(os.path.join(td, "log", mds_label + ".log"))
+        # then we spawn a subprocess for the MDS C code for each output, the work is
+        # done in the subprocesses so threads are enough to run them concurrently
+        max_workers = max(1, min(os.cpu_count() or 1, len(batch)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return_codes = list(executor.map(gfMDS_run_mds, cmds, log_file_paths))
+        # later outputs may use these outputs so stop if any of them failed
+        failed = []
+        for mds_label, return_code in zip(batch, return_codes):
+            mds_out_file = os.path.join(l5im["outputs"][mds_label]["out_base_path"], "mds.csv")
+            if return_code != 0 or not os.path.isfile(mds_out_file):
+                msg = " MDS gap filling failed for " + mds_label
+                msg += " (return code " + str(return_code) + ")"
+                logger.error(msg)
+                failed.append(mds_label)
+        if len(failed) > 0:
+            msg = " MDS gap filling failed for " + ",".join(failed)
+            raise RuntimeError(msg)
+        # now read the MDS output files and put the results into the data structure
+        for mds_label in batch:
+            # make the output file name
+            out_name = site_name+"_"+level+"_"+mds_label+"_mds.csv"
+            out_base_path = l5im["outputs"][mds_label]["out_base_path"]
+            out_file_path = os.path.join(out_base_path, out_name)
+            mds_out_file = os.path.join(out_base_path, "mds.csv")
+            os.rename(mds_out_file, out_file_path)
+            gfMDS_get_mds_output(ds, mds_label, out_file_path, l5_info, called_by)
+            # mask long gaps, if requested
+            gfMDS_mask_long_gaps(ds, mds_label, l5_info, called_by)
+            # plot the MDS results
+            target = l5im["outputs"][mds_label]["target"]
+            drivers = l5im["outputs"][mds_label]["drivers"]
+            title = site_name+' : Comparison of tower and MDS data for '+target
+            pd = gfMDS_initplot(site_name=site_name, label=target,
+                                fig_num=mds_labels.index(mds_label), title=title,
+                                nDrivers=len(drivers), show_plots=True)
+            gfMDS_plot(pd, ds, mds_label, l5_info, called_by)
     return
 
+def gfMDS_get_batches(l5im, mds_labels):
+    """
+    Purpose:
+     Split the MDS outputs into batches that can be run at the same time.
+     An output that uses an earlier output in the same batch as its target or
+     as a driver starts a new batch so that it sees the gap filled data.
+    Usage:
+     batches = gfMDS_get_batches(l5im, mds_labels)
+     where l5im is the MDS section of the L5 information dictionary
+           mds_labels is the list of MDS outputs in the order they are done
+           batches is a list of lists of MDS outputs
+    """
+    batches = []
+    batch = []
+    for mds_label in mds_labels:
+        output = l5im["outputs"][mds_label]
+        inputs = [output["target"]] + output["drivers"]
+        # variables written to the data structure by the outputs in this batch
+        prefixes = tuple(["MDS_" + l5im["outputs"][l]["target"] + "_" for l in batch])
+        if any((label in batch) or label.startswith(prefixes) for label in inputs):
+            batches.append(batch)
+            batch = []
+        batch.append(mds_label)
+    if len(batch) > 0:
+        batches.append(batch)
+    return batches
+
+def gfMDS_run_mds(cmd, log_file_path):
+    """
+    Purpose:
+     Run the MDS C code in a subprocess and write its output to a log file.
+    Usage:
+     return_code = gfMDS_run_mds(cmd, log_file_path)
+     where cmd is the command list from gfMDS_make_cmd_string
+           log_file_path is the full path of the log file
+    """
+    with open(log_file_path, "w") as mdslogfile:
+        return_code = subprocess.call(cmd, stdout=mdslogfile)
+    return return_code
+
 def gfMDS_get_mds_output(ds, mds_label, out_file_path, l5_info, called_by):
     """
     Purpose:
@@ -484,37 +484,88 @@ def csv_read_series(cf):
     ds.info["returncodes"] = {"value":0,"message":"OK"}
     return ds
 
-def DataFrameToDataStructure(df, l1_info):
+def DataFramesToDataStructure(dfs, l1_info):
     """
     Purpose:
-     Convert a pandas data frame to a PFP data structure and add the metadata
-     from the control file.
+     Convert the pandas data frames returned by pfp_io.ReadInputFile() (1 per
+     Excel worksheet) to a PFP data structure and add the metadata from the
+     control file.
+     The data from each data frame is copied straight into a single 2D array
+     that spans all of the times in the data frames.
+    Usage:
+     ds = pfp_io.DataFramesToDataStructure(dfs, l1_info)
+     where dfs is a dictionary of pandas data frames
+           l1_info is the information dictionary created from the L1 control file
+           ds is a PFP data structure
+    """
+    df_names = sorted(list(dfs))
+    if len(df_names) > 1:
+        msg = " Merging data frames into a data structure"
+        logger.info(msg)
+        # get the earliest start and latest end time
+        start = min([dfs[df_name].index.min() for df_name in df_names])
+        end = max([dfs[df_name].index.max() for df_name in df_names])
+        # get the timestep as a string pandas will recognise
+        ts = str(int(l1_info["read_excel"]["Global"]["time_step"])) + "min"
+        # create a pandas datetime range, any times in the data frames that are
+        # not on the time step are kept
+        dt = pandas.date_range(start, end, freq=ts)
+        for df_name in df_names:
+            dt = dt.union(dfs[df_name].index)
+    else:
+        dt = dfs[df_names[0]].index
+    labels = [label for df_name in df_names for label in list(dfs[df_name])]
+    # times without data in a data frame are NaN, as they are after merging
+    values = numpy.full((len(dt), len(labels)), numpy.nan, dtype=numpy.float64, order="F")
+    n = 0
+    for df_name in df_names:
+        df = dfs[df_name]
+        ncols = len(df.columns)
+        # only non-numeric columns need to be coerced element by element
+        df = df.apply(lambda s: s if pandas.api.types.is_numeric_dtype(s) else s.apply(coerce_to_numeric))
+        if len(df_names) > 1:
+            rows = dt.get_indexer(df.index)
+        else:
+            rows = slice(None)
+        values[rows, n:n+ncols] = df.to_numpy(dtype=numpy.float64)
+        n = n + ncols
+    ds = data_structure_from_array(dt, labels, values, l1_info)
+    return ds
+
+def data_structure_from_array(dt, labels, values, l1_info):
+    """
+    Purpose:
+     Create a PFP data structure from a datetime index and a 2D array of data
+     with 1 column per label and add the metadata from the control file.
+    Usage:
+     ds = pfp_io.data_structure_from_array(dt, labels, values, l1_info)
+     where dt is a pandas DatetimeIndex
+           labels is a list of variable labels, 1 per column of values
+           values is a 2D array of float64
+           l1_info is the information dictionary created from the L1 control file
     """
-    msg = " Converting data frame to data structure"
-    logger.info(msg)
     l1ire = l1_info["read_excel"]
     # create a data structure
     ds = DataStructure()
     # add the global attributes to the data structure
     ds.root["Attributes"] = copy.deepcopy(l1ire["Global"])
     # get the number of records in the data frame
-    nrecs = len(df.index.values)
+    nrecs = len(dt)
     zeros = numpy.zeros(nrecs, dtype=numpy.int32)
     ones = numpy.ones(nrecs, dtype=numpy.int32)
     ds.root["Attributes"]["nc_nrecs"] = nrecs
     # put the datetime index into the data structure
     var = pfp_utils.CreateEmptyVariable("DateTime", nrecs)
     # convert from numpy.datetime[ns] to Python datetime
-    var["Data"] = df.index.to_pydatetime()
+    var["Data"] = dt.to_pydatetime()
     var["Flag"] = zeros
     var["Attr"] = {"long_name": "Datetime in local timezone",
                    "cf_role": "timeseries_id"}
     pfp_utils.CreateVariable(ds, var)
     # now do the other variables
-    labels = list(df)
-    for label in labels:
+    for n, label in enumerate(labels):
         var = pfp_utils.CreateEmptyVariable(label, nrecs)
-        data = df[label].apply(coerce_to_numeric).to_numpy()
+        data = values[:, n]
         # mask non-finite records
         mask = numpy.isfinite(data)
         var["Data"] = numpy.ma.masked_where(mask == False, data)
@@ -850,18 +901,16 @@ def ReadExcelWorkbook(l1_info):
     # rename the pandas dataframe columns from the Excel variable names to the netCDF variable names
     # loop over the sheets in the Excel workbook
     for df_name in df_names:
-        # create an empty dataframe with the index
-        tmp = pandas.DataFrame(index=dfs[df_name].index)
-        # loop over the netCDF variable names, done to allow variables with duplicate values
-        for l in list(l1ire["xl_sheets"][df_name]["nc_labels"].keys()):
-            tmp[l] = dfs[df_name][l1ire["xl_sheets"][df_name]["nc_labels"][l]].copy()
-        # copy the new dataframe to the old name
-        dfs[df_name] = tmp.copy()
+        nc_labels = l1ire["xl_sheets"][df_name]["nc_labels"]
+        # select all columns in one go, a list selection returns a new data frame
+        # and allows the same Excel column to be used for more than one variable
+        tmp = dfs[df_name][[nc_labels[l] for l in nc_labels]]
+        # rename the columns to the netCDF variable names
+        tmp.columns = list(nc_labels.keys())
+        dfs[df_name] = tmp
     pfp_log.debug_function_leave(inspect.currentframe().f_code.co_name)
     # discard empty data frames
-    for key in list(dfs.keys()):
-        if len(dfs[key]) == 0:
-            dfs.pop(key)
+    dfs = {key: df for key, df in dfs.items() if len(df) > 0}
     return dfs
 
 def read_excel_workbook_get_timestamp(dfs, df_name, l1_info):
@@ -2055,7 +2104,6 @@ def NetCDFConcatenate(info):
      pfp_top_level.do_file_concatenate()
     Calls:
      pfp_io.netcdf_concatenate_read_input_files(info)
-     pfp_utils.GetVariable()
      pfp_io.netcdf_concatenate_create_ds_out(data, dt_out, chrono_files, labels)
     Side effects:
     Author: PRI
@@ -2064,19 +2112,19 @@ def NetCDFConcatenate(info):
     inc = info["NetCDFConcatenate"]
     # read the input files (data is an OrderedDict)
     data = netcdf_concatenate_read_input_files(info)
-    # get the file names in data
-    file_names = list(data.keys())
     # get the earliest start time, the latest end time and a list of unique variable names
-    for file_name in file_names:
+    labels = set(inc["labels"])
+    for file_name, ds in data.items():
         # get the start and end times
-        dt = pfp_utils.GetVariable(data[file_name], "DateTime")
-        inc["time_coverage_start"].append(dt["Data"][0])
-        inc["time_coverage_end"].append(dt["Data"][-1])
-        inc["labels"] = inc["labels"] + list(data[file_name].root["Variables"].keys())
+        ldt = ds.root["Variables"]["DateTime"]["Data"]
+        inc["time_coverage_start"].append(ldt[0])
+        inc["time_coverage_end"].append(ldt[-1])
+        labels.update(ds.root["Variables"].keys())
     # get a list of unique variable names and remove unwanted labels
-    inc["labels"] = list(set(inc["labels"]))
-    # get a list of files with start times in chronological order
-    inc["chrono_files"] = [f for d, f in sorted(zip(inc["time_coverage_start"], inc["in_file_names"]))]
+    inc["labels"] = list(labels)
+    # get a list of files with start times in chronological order, only files
+    # that were read are used so the start times and file names stay paired
+    inc["chrono_files"] = [f for d, f in sorted(zip(inc["time_coverage_start"], data.keys()))]
     # remove depreacted variables
     netcdf_concatenate_remove_depreacted(info)
     # check units for each variable are consistent across all files to be concatenated
@@ -2629,52 +2677,6 @@ def netcdf_concatenate_truncate(ds_in, info):
     ds_out.root["Attributes"]["nc_nrecs"] = len(ds_out.root["Variables"]["DateTime"]["Data"])
     return ds_out
 
-def MergeDataFrames(dfs, l1_info):
-    """
-    Purpose:
-     Merge several data frames into a single data frame.
-     pfp_io.ReadExcelWorkbook() returns one pandas data frame per worksheet in the
-     workbook.  This routine combines these data frames into a single data frame
-     that spans all of the times on the worksheets.
-    Usage:
-     df = pfp_io.MergeDataFrames(dfs, l1_info)
-     where dfs is a dictionary of pandas data frames
-           l1_info is the information dictionary created from the L1 control file
-           df is a single pandas data frame containing all data from the data frames
-              in dfs.
-    Side effects:
-     Returns a pandas data frame.
-    Author: PRI
-    DaMergeDataFrameste: Back in the day
-    """
-    # get a list of data frame names
-    df_names = list(dfs)
-    # merge data frames
-    if len(df_names) > 1:
-        msg = " Merging into a single data frame"
-        logger.info(msg)
-        # get the earliest start and latest end time
-        start = min(dfs[df_names[0]].index.values)
-        end = max(dfs[df_names[0]].index.values)
-        for df_name in df_names[1:]:
-            start = min([min(dfs[df_name].index.values), start])
-            end = max([max(dfs[df_name].index.values), end])
-        # get the timestep as a string pandas will recognise
-        ts = str(int(l1_info["read_excel"]["Global"]["time_step"])) + "T"
-        # create a pandas datetime range
-        dt = pandas.date_range(start, end, freq=ts)
-        # create an empty data frame
-        df = pandas.DataFrame({'DateTime': dt})
-        # set the datetime as the index
-        df = df.set_index("DateTime")
-        # list of data frames
-        frames = [df] + [dfs[s] for s in sorted(list(dfs.keys()))]
-        # merge the data frames on columns (axis=1)
-        df = pandas.concat(frames, axis=1)
-    else:
-        df = dfs[df_names[0]]
-    return df
-
 def MergeDataStructures(ds_dict, l1_info):
     """
     Purpose:
@@ -3171,7 +3173,7 @@ def NetCDFRead(nc_file_uri, checktimestep=True, fixtimestepmethod="round", updat
         ds = ds_update(ds)
     return ds
 
-def NetCDFWrite(nc_file_path, ds, nc_type='NETCDF4', outputlist=None, ndims=3):
+def NetCDFWrite(nc_file_path, ds, nc_type='NETCDF4', outputlist=None, ndims=3, complevel=1):
     """
     Purpose:
      Wrapper for the pfp_io.nc_write_series() routine so we have a nice name
@@ -3181,12 +3183,20 @@ def NetCDFWrite(nc_file_path, ds, nc_type='NETCDF4', outputlist=None, ndims=3):
      pfp_io.NetCDFWrite(nc_file_uri, ds)
      where nc_file_uri is a netCDF file name or URL pointing to a netCDF file
            ds is a PFP data structure
+           complevel is the zlib compression level (0 for no compression),
+                     only used for NETCDF4 and NETCDF4_CLASSIC files
     Author: PRI
     Date: June 2021
     """
     file_name = os.path.split(nc_file_path)
     msg = " Writing netCDF file " + file_name[1]
     logger.info(msg)
+    # compressed variables are only supported by the netCDF4 formats, the
+    # shuffle filter improves the compression of the floating point data
+    compression = {}
+    if nc_type in ["NETCDF4", "NETCDF4_CLASSIC"] and complevel > 0:
+        compression = {"zlib": True, "complevel": complevel, "shuffle": True}
+    nc_file = None
     try:
         nc_file = netCDF4.Dataset(nc_file_path, "w", format=nc_type)
         groups = list(vars(ds))
@@ -3195,7 +3205,8 @@ def NetCDFWrite(nc_file_path, ds, nc_type='NETCDF4', outputlist=None, ndims=3):
         if len(groups) == 1:
             # write the global attributes to the netCDF file
             nc_write_globalattributes(nc_file, ds)
-            nc_write_series(nc_file, ds, outputlist=None, ndims=3)
+            nc_write_series(nc_file, ds, outputlist=None, ndims=3,
+                            compression=compression)
         elif len(groups) > 1:
             # write the global attributes to the netCDF file
             nc_write_globalattributes(nc_file, ds)
@@ -3204,14 +3215,15 @@ def NetCDFWrite(nc_file_path, ds, nc_type='NETCDF4', outputlist=None, ndims=3):
                 if len(dsg["Variables"]) == 0:
                     continue
                 nc_group = nc_file.createGroup(group)
-                nc_write_group(nc_group, ds, group)
+                nc_write_group(nc_group, ds, group, compression=compression)
         nc_file.close()
     except Exception:
         msg = " Unable to write netCDF file " + file_name[1]
         logger.error(msg)
         error_message = traceback.format_exc()
         logger.error(error_message)
-        nc_file.close()
+        if nc_file is not None:
+            nc_file.close()
         return
     return
 
@@ -3296,7 +3308,7 @@ def nc_write_globalattributes(nc_file, ds, flag_defs=True):
             setattr(nc_file, item, attr)
     return
 
-def nc_write_group(nc_obj, ds, group):
+def nc_write_group(nc_obj, ds, group, compression=None):
     """
     Purpose:
      Write the L6 summary statistics (daily, monthly, annual and cumulative)
@@ -3305,6 +3317,7 @@ def nc_write_group(nc_obj, ds, group):
     Author: PRI
     Date: January 2018
     """
+    compression = compression or {}
     dsr = getattr(ds, "root")
     dsg = getattr(ds, group)
     # sanity check
@@ -3354,15 +3367,15 @@ def nc_write_group(nc_obj, ds, group):
     labels = sorted([l for l in list(dsg["Variables"].keys()) if l not in ["DateTime", "time"]])
     # write the variables to the netCDF file object
     for label in labels:
-        nc_var = nc_obj.createVariable(label, "d", dims)
-        nc_var[:, 0, 0] = dsg["Variables"][label]["Data"].tolist()
+        nc_var = nc_obj.createVariable(label, "d", dims, **compression)
         for attr_key in dsg["Variables"][label]["Attr"]:
             if attr_key not in ["format"]:
                 attr_value = dsg["Variables"][label]["Attr"][attr_key]
                 nc_var.setncattr(attr_key, attr_value)
+        nc_var[:, 0, 0] = dsg["Variables"][label]["Data"]
     return
 
-def nc_write_series(ncFile, ds, outputlist=None, ndims=3):
+def nc_write_series(ncFile, ds, outputlist=None, ndims=3, compression=None):
     """
     Purpose:
      Write the contents of a data structure to a netCDF file.
@@ -3371,9 +3384,12 @@ def nc_write_series(ncFile, ds, outputlist=None, ndims=3):
      pfp_io.nc_write_series(nc_file,ds)
      where nc_file is a netCDF file object returned by pfp_io.nc_open_write
            ds is a data structure
+           compression is a dictionary of netCDF4 compression keywords
+                       e.g. {"zlib": True, "complevel": 1, "shuffle": True}
     Author: PRI
     Date: Back in the day
     """
+    compression = compression or {}
     # we specify the size of the Time dimension because netCDF4 is slow to write files
     # when the Time dimension is unlimited
     nRecs = int(ds.root["Attributes"]['nc_nrecs'])
@@ -3427,7 +3443,7 @@ def nc_write_series(ncFile, ds, outputlist=None, ndims=3):
             outputlist.remove(ThisOne)
     # write everything else to the netCDF file
     for ThisOne in sorted(outputlist):
-        nc_write_var(ncFile,ds,ThisOne,dims)
+        nc_write_var(ncFile,ds,ThisOne,dims,compression=compression)
     # write the coordinate reference system (crs) variable
     if "crs" not in outputlist:
         ncVar = ncFile.createVariable("crs","i",())
@@ -3446,7 +3462,7 @@ def nc_write_series(ncFile, ds, outputlist=None, ndims=3):
     setattr(ncVar, "cf_role", "timeseries_id")
     return
 
-def nc_write_var(ncFile, ds, ThisOne, dim):
+def nc_write_var(ncFile, ds, ThisOne, dim, compression=None):
     """
     Purpose:
      Function to write data from a series in the data structure to a netCDF variable.
@@ -3456,26 +3472,25 @@ def nc_write_var(ncFile, ds, ThisOne, dim):
             ds is the data structure
             ThisOne is the label of a series in ds
             ("time","latitude","longitude") is the dimension tuple
+            compression is a dictionary of netCDF4 compression keywords
     Author: PRI
     Date: August 2014
     """
+    compression = compression or {}
     # get the data type of the series in ds
     dt = get_ncdtype(ds.root["Variables"][ThisOne]["Data"])
     # create the netCDF variable
     try:
-        ncVar = ncFile.createVariable(ThisOne, dt, dim)
+        ncVar = ncFile.createVariable(ThisOne, dt, dim, **compression)
     except RuntimeError:
         msg = "Error writing variable to netCDF file: "+ThisOne
         raise Exception(msg)
-    # different writes to the variable depending on whether it is 1D or 3D
-    if len(dim) == 1:
-        ncVar[:] = ds.root["Variables"][ThisOne]["Data"].tolist()
-    elif len(dim) == 3:
-        ncVar[:, 0, 0] = ds.root["Variables"][ThisOne]["Data"].tolist()
-    else:
+    # check the dimensions before doing anything else
+    if len(dim) not in [1, 3]:
         msg = "Unrecognised dimension request for netCDF variable: "+ThisOne
         raise RuntimeError(msg)
-    # write the attributes
+    # write the attributes before the data so the netCDF file does not have
+    # to switch between define and data modes
     vattrs = sorted(list(ds.root["Variables"][ThisOne]["Attr"].keys()))
     for item in vattrs:
         if item not in ["_FillValue", "missing_value", "valid_max", "vaild_min", "valid_range"]:
@@ -3500,21 +3515,23 @@ def nc_write_var(ncFile, ds, ThisOne, dim):
                 msg = " Unable to write valid_range attribute for " + ThisOne
                 msg+= ", skipping ..."
                 logger.warning(msg)
+    # write the data, the arrays are written directly rather than as lists
+    if len(dim) == 1:
+        ncVar[:] = ds.root["Variables"][ThisOne]["Data"]
+    else:
+        ncVar[:, 0, 0] = ds.root["Variables"][ThisOne]["Data"]
     # get the data type of the QC flag
     dt = get_ncdtype(ds.root["Variables"][ThisOne]["Flag"])
     # create the variable
-    ncVar = ncFile.createVariable(ThisOne+"_QCFlag", dt, dim)
-    # write 1D or 3D
-    if len(dim)==1:
-        ncVar[:] = ds.root["Variables"][ThisOne]["Flag"].tolist()
-    elif len(dim)==3:
-        ncVar[:, 0, 0] = ds.root["Variables"][ThisOne]["Flag"].tolist()
-    else:
-        msg = "Unrecognised dimension request for netCDF variable: "+ThisOne
-        raise RuntimeError(msg)
+    ncVar = ncFile.createVariable(ThisOne+"_QCFlag", dt, dim, **compression)
     # set the attributes
     ncVar.setncattr("long_name", ThisOne+"QC flag")
     ncVar.setncattr("units", "1")
+    # write 1D or 3D
+    if len(dim) == 1:
+        ncVar[:] = ds.root["Variables"][ThisOne]["Flag"]
+    else:
+        ncVar[:, 0, 0] = ds.root["Variables"][ThisOne]["Flag"]
     return
 
 def xl_open_write(xl_name):
@@ -35,10 +35,8 @@ def l1qc(cfg):
     dfs = pfp_io.ReadInputFile(l1_info)
     # check the timestamps
     pfp_io.CheckTimeStamps(dfs, l1_info, fix=True)
-    # merge the data frames (1 per Excel worksheet)
-    df = pfp_io.MergeDataFrames(dfs, l1_info)
-    # convert the data frame to a PFP data structure and add metadata
-    ds = pfp_io.DataFrameToDataStructure(df, l1_info)
+    # merge the data frames (1 per Excel worksheet) into a PFP data structure and add metadata
+    ds = pfp_io.DataFramesToDataStructure(dfs, l1_info)
     # write the processing level to a global attribute
     ds.root["Attributes"]["processing_level"] = "L1"
     # apply linear corrections to the data
@@ -60,7 +60,7 @@ def get_bootstrap_results(contents):
     return bootstrap_results
 
 def make_data_array(cf, ds, current_year):
-    ldt = pfp_utils.GetVariable(ds, "DateTime")
+    ldt = ds.root["Variables"]["DateTime"]["Data"]
     nrecs = int(ds.root["Attributes"]["nc_nrecs"])
     ts = int(float(ds.root["Attributes"]["time_step"]))
     start = datetime.datetime(current_year, 1, 1, 0, 0, 0) + datetime.timedelta(minutes=ts)
@@ -69,14 +69,18 @@ def make_data_array(cf, ds, current_year):
     mt = numpy.ones(len(cdt))*float(-9999)
     mt_list = [cdt] + [mt for n in list(cf["Variables"].keys())]
     data = numpy.stack(mt_list, axis=-1)
-    si = pfp_utils.GetDateIndex(ldt["Data"], start, default=0)
-    ei = pfp_utils.GetDateIndex(ldt["Data"], end, default=nrecs)
-    dt = pfp_utils.GetVariable(ds, "DateTime", start=si, end=ei)
-    idx1, idx2 = pfp_utils.FindMatchingIndices(cdt, dt["Data"])
+    si = pfp_utils.GetDateIndex(ldt, start, default=0)
+    ei = pfp_utils.GetDateIndex(ldt, end, default=nrecs)
+    idx1, idx2 = pfp_utils.FindMatchingIndices(cdt, ldt[si:ei+1])
     for n, cf_label in enumerate(list(cf["Variables"].keys())):
         label = cf["Variables"][cf_label]["name"]
-        var = pfp_utils.GetVariable(ds, label, start=si, end=ei)
-        data[idx1,n+1] = var["Data"]
+        if label not in ds.root["Variables"]:
+            msg = " MPT: " + label + " not found in data structure"
+            logger.error(msg)
+            continue
+        # only the data are needed so slice them straight from the data structure
+        # rather than using GetVariable to copy the data, flag and attributes
+        data[idx1,n+1] = ds.root["Variables"][label]["Data"][si:ei+1]
     # convert datetime to ISO dates
     data[:,0] = numpy.array([int(xdt.strftime("%Y%m%d%H%M")) for xdt in cdt])
     return data
@@ -644,8 +644,7 @@ class partition(object):
         self.priors = {"rb": self.df["ER"].mean(), "Eo": 100}
         if self.l6_info["Options"]["called_by"] in ["ERUsingLasslop"]:
             self.priors["alpha"] = -0.01
-            lwr = self.df.loc[self.df.PPFD > self.noct_threshold, 'NEE'].quantile(0.03)
-            upr = self.df.loc[self.df.PPFD > self.noct_threshold, 'NEE'].quantile(0.97)
+            lwr, upr = self.df.loc[self.df.PPFD > self.noct_threshold, 'NEE'].quantile([0.03, 0.97])
             self.priors["beta"] = (lwr - upr)
             self.priors["k"] = 0
         return
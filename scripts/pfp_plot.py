@@ -727,8 +727,7 @@ def plot_explore_fingerprints(ds, selections):
             data_daily = var["Data"].reshape(nDays, nPerDay)
             # clip data to the 0.25 and 99.75 percentiles to suppress outliers
             # this helps make the colour scale even
-            vmin = numpy.percentile(numpy.ma.compressed(data_daily), 0.25)
-            vmax = numpy.percentile(numpy.ma.compressed(data_daily), 99.75)
+            vmin, vmax = numpy.percentile(numpy.ma.compressed(data_daily), [0.25, 99.75])
             # get the start and end dates as numbers
             sd = mdt.date2num(ldt[0])
             ed = mdt.date2num(ldt[-1])
@@ -237,24 +237,26 @@ def EcoResp(ds, l6_info, called_by, xl_writer):
         targets = pfp_utils.string_to_list(target)
         if called_by == "ERUsingLasslop" and "Fco2" in ds.root["Variables"].keys():
             targets.append("Fco2")
-        # list of variables required for this partitioning method
-        labels = drivers + targets
-        # get the required variables as a data frame
-        df = pandas.DataFrame({label: ds.root["Variables"][label]["Data"] for label in labels},
-                              index = ds.root["Variables"]["DateTime"]["Data"])
+        # list of variables required for this partitioning method, without duplicates
+        labels = list(dict.fromkeys(drivers + targets))
+        # get the required variables as a data frame, the data are copied into a
+        # single 2D array so pandas does not have to consolidate separate columns
+        data = numpy.empty((nrecs, len(labels)), dtype=numpy.float64)
+        for n, label in enumerate(labels):
+            data[:, n] = numpy.ma.filled(ds.root["Variables"][label]["Data"], numpy.nan)
         # get a boolean array
         is_valid = numpy.tile(True, int(ds.root["Attributes"]["nc_nrecs"]))
         # loop over the drivers
         for driver in drivers:
             # allow gap filled drivers
             is_valid *= numpy.mod(ds.root["Variables"][driver]["Flag"], 10) == 0
-        # set records with missing drivers to NaN
+        # set targets to NaN where drivers are missing or where the targets are
+        # not observations (ER, NEE), done on the array before the data frame is built
         for target in targets:
-            df.loc[~is_valid, target] = numpy.nan
-        # loop over targets
-        for target in targets:
-            # only allow observed (not gap filled) targets (ER, NEE)
-            df.loc[ds.root["Variables"][target]["Flag"] != 0, target] = numpy.nan
+            is_observed = ds.root["Variables"][target]["Flag"] == 0
+            data[~(is_valid & is_observed), labels.index(target)] = numpy.nan
+        df = pandas.DataFrame(data, index=ds.root["Variables"]["DateTime"]["Data"],
+                              columns=labels, copy=False)
         # Pass the dataframe to the respiration class and get the results
         ptc = pfp_part.partition(df, xl_writer, l6_info)
         params_df = ptc.estimate_parameters(mode = er_mode)
@@ -1473,7 +1475,7 @@ def get_daynight_indicator(ds, l6_info):
         inds[idx] = numpy.int32(1)
     else:
         msg = "Unrecognised DayNightFilter option in L6 control file"
-        raise Exception(msg)
+        raise ValueError(msg)
     return daynight_indicator
 
 def get_day_indicator(cf, ds):
@@ -1531,7 +1533,7 @@ def get_day_indicator(cf, ds):
         inds[index] = numpy.int32(0)
     else:
         msg = "Unrecognised DayNightFilter option in control file"
-        raise Exception(msg)
+        raise ValueError(msg)
     return indicator_day
 
 def get_evening_indicator(cf, ds):
@@ -1634,7 +1636,7 @@ def get_night_indicator(cf, ds):
         inds[index] = numpy.int32(1)
     else:
         msg = "Unrecognised DayNightFilter option in control file"
-        raise Exception(msg)
+        raise ValueError(msg)
     return indicator_night
 
 def get_turbulence_indicator_ustar_basic(ldt, ustar, ustar_dict):
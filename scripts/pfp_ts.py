@@ -1,6 +1,7 @@
 # standard
 import copy
 import datetime
+import functools
 import inspect
 import logging
 # 3d party
@@ -944,21 +945,25 @@ def CheckCovarianceUnits(ds):
     logger.info(' Checking covariance units')
     co2_list = ["UxC", "UyC", "UzC"]
     h2o_list = ["UxA", "UyA", "UzA", "UxH", "UyH", "UzH"]
+    # Ta and ps are only read once and only if a conversion is needed
+    Ta, ps = None, None
     for item in co2_list:
-        if item not in list(ds.root["Variables"].keys()): continue
+        if item not in ds.root["Variables"]: continue
         var = pfp_utils.GetVariable(ds, item)
         if "umol" in var["Attr"]["units"]:
-            Ta = pfp_utils.GetVariable(ds, "Ta")
-            ps = pfp_utils.GetVariable(ds, "ps")
+            if Ta is None:
+                Ta = pfp_utils.GetVariable(ds, "Ta")
+                ps = pfp_utils.GetVariable(ds, "ps")
             var["Data"] = pfp_mf.co2_mgCO2pm3fromppm(var["Data"], Ta["Data"], ps["Data"])
             var["Attr"]["units"] = "mg/m^2/s"
             pfp_utils.CreateVariable(ds, var)
     for item in h2o_list:
-        if item not in list(ds.root["Variables"].keys()): continue
+        if item not in ds.root["Variables"]: continue
         var = pfp_utils.GetVariable(ds, item)
         if "mmol" in var["Attr"]["units"]:
-            Ta = pfp_utils.GetVariable(ds, "Ta")
-            ps = pfp_utils.GetVariable(ds, "ps")
+            if Ta is None:
+                Ta = pfp_utils.GetVariable(ds, "Ta")
+                ps = pfp_utils.GetVariable(ds, "ps")
             var["Data"] = pfp_mf.h2o_gpm3frommmolpmol(var["Data"], Ta["Data"], ps["Data"])
             var["Attr"]["units"] = "g/m^2/s"
             if "H" in item: item = item.replace("H","A")
@@ -1050,8 +1055,9 @@ def CoordRotation2D(cf, ds, info):
     if rotate:
         logger.info(" Applying 2D coordinate rotation (components and covariances)")
         # get the 2D and 3D wind speeds
-        ws2d = numpy.ma.sqrt(Ux["Data"]**2 + Uy["Data"]**2)
-        ws3d = numpy.ma.sqrt(Ux["Data"]**2 + Uy["Data"]**2 + Uz["Data"]**2)
+        ws2d_sq = Ux["Data"]**2 + Uy["Data"]**2
+        ws2d = numpy.ma.sqrt(ws2d_sq)
+        ws3d = numpy.ma.sqrt(ws2d_sq + Uz["Data"]**2)
         # get the sine and cosine of the angles through which to rotate
         #  - first we rotate about the Uz axis by eta to get v = 0
         #  - then we rotate about the v axis by theta to get w = 0
@@ -1062,32 +1068,46 @@ def CoordRotation2D(cf, ds, info):
         # get the rotation angles
         theta = numpy.rad2deg(numpy.arctan2(st, ct))
         eta = numpy.rad2deg(numpy.arctan2(se, ce))
+        # products of the sines and cosines used more than once below, these are
+        # calculated once to save passes over the data
+        ctce = ct*ce
+        ctse = ct*se
+        stce = st*ce
+        stse = st*se
+        cese = ce*se
+        ct2 = ct*ct
+        st2 = st*st
+        ce2 = ce*ce
+        se2 = se*se
         # do the wind velocity components first
-        u = Ux["Data"]*ct*ce + Uy["Data"]*ct*se + Uz["Data"]*st   # longitudinal component in natural wind coordinates
+        u = Ux["Data"]*ctce + Uy["Data"]*ctse + Uz["Data"]*st     # longitudinal component in natural wind coordinates
         v = Uy["Data"]*ce - Ux["Data"]*se                         # lateral component in natural wind coordinates
-        w = Uz["Data"]*ct - Ux["Data"]*st*ce - Uy["Data"]*st*se   # vertical component in natural wind coordinates
+        w = Uz["Data"]*ct - Ux["Data"]*stce - Uy["Data"]*stse     # vertical component in natural wind coordinates
         # do the variances
-        uu = UxUx["Data"]*ct**2*ce**2 + UyUy["Data"]*ct**2*se**2 + UzUz["Data"]*st**2 + \
-            2*UxUy["Data"]*ct**2*ce*se + 2*UxUz["Data"]*ct*st*ce + 2*UyUz["Data"]*ct*st*se
-        vv = UyUy["Data"]*ce**2 + UxUx["Data"]*se**2 - 2*UxUy["Data"]*ce*se
-        ww = UzUz["Data"]*ct**2 + UxUx["Data"]*st**2*ce**2 + UyUy["Data"]*st**2*se**2 - \
-            2*UxUz["Data"]*ct*st*ce - 2*UyUz["Data"]*ct*st*se + 2*UxUy["Data"]*st**2*ce*se
+        uu = UxUx["Data"]*ct2*ce2 + UyUy["Data"]*ct2*se2 + UzUz["Data"]*st2 + \
+            2*UxUy["Data"]*ct2*cese + 2*UxUz["Data"]*ct*stce + 2*UyUz["Data"]*ct*stse
+        vv = UyUy["Data"]*ce2 + UxUx["Data"]*se2 - 2*UxUy["Data"]*cese
+        ww = UzUz["Data"]*ct2 + UxUx["Data"]*st2*ce2 + UyUy["Data"]*st2*se2 - \
+            2*UxUz["Data"]*ct*stce - 2*UyUz["Data"]*ct*stse + 2*UxUy["Data"]*st2*cese
         # now do the scalar covariances
-        wT = UzT["Data"]*ct - UxT["Data"]*st*ce - UyT["Data"]*st*se       # covariance(w,T) in natural wind coordinate system
-        wA = UzA["Data"]*ct - UxA["Data"]*st*ce - UyA["Data"]*st*se       # covariance(w,A) in natural wind coordinate system
-        wC = UzC["Data"]*ct - UxC["Data"]*st*ce - UyC["Data"]*st*se       # covariance(w,C) in natural wind coordinate system
+        wT = UzT["Data"]*ct - UxT["Data"]*stce - UyT["Data"]*stse       # covariance(w,T) in natural wind coordinate system
+        wA = UzA["Data"]*ct - UxA["Data"]*stce - UyA["Data"]*stse       # covariance(w,A) in natural wind coordinate system
+        wC = UzC["Data"]*ct - UxC["Data"]*stce - UyC["Data"]*stse       # covariance(w,C) in natural wind coordinate system
         # now do the momentum covariances
         # full equations, Wesely PhD thesis via James Cleverly and EddyPro
+        ct2_st2 = ct2 - st2
+        ce2_se2 = ce2 - se2
+        ctst = ct*st
         # covariance(w,x) in natural wind coordinate system
-        uw = UxUz["Data"]*ce*(ct*ct-st*st) - 2*UxUy["Data"]*ct*st*ce*se + \
-            UyUz["Data"]*se*(ct*ct-st*st) - UxUx["Data"]*ct*st*ce*ce - \
-            UyUy["Data"]*ct*st*se*se + UzUz["Data"]*ct*st
+        uw = UxUz["Data"]*ce*ct2_st2 - 2*UxUy["Data"]*ctst*cese + \
+            UyUz["Data"]*se*ct2_st2 - UxUx["Data"]*ctst*ce2 - \
+            UyUy["Data"]*ctst*se2 + UzUz["Data"]*ctst
         # covariance(x,y) in natural wind coordinate system
-        uv = UxUy["Data"]*ct*(ce*ce-se*se) + UyUz["Data"]*st*ce - \
-            UxUz["Data"]*st*se - UxUx["Data"]*ct*ce*se + UyUy["Data"]*ct*ce*se
+        uv = UxUy["Data"]*ct*ce2_se2 + UyUz["Data"]*stce - \
+            UxUz["Data"]*stse - UxUx["Data"]*ct*cese + UyUy["Data"]*ct*cese
         # covariance(w,y) in natural wind coordinate system
-        vw = UyUz["Data"]*ct*ce - UxUz["Data"]*ct*se - UxUy["Data"]*st*(ce*ce-se*se) + \
-             UxUx["Data"]*st*ce*se - UyUy["Data"]*st*ce*se
+        vw = UyUz["Data"]*ctce - UxUz["Data"]*ctse - UxUy["Data"]*st*ce2_se2 + \
+             UxUx["Data"]*stce*se - UyUy["Data"]*stce*se
     else:
         msg = " 2D coordinate rotation disabled, using unrotated components and covariances"
         logger.warning(msg)
@@ -1715,22 +1735,9 @@ def DoFunctions(ds, info):
     Date: September 2015
     """
     nrecs = int(ds.root["Attributes"]["nc_nrecs"])
-    implemented_func_units = [name for name,data in
-                              inspect.getmembers(pfp_func_units,
-                                                 inspect.isfunction)]
-    implemented_func_stats = [name for name,data in
-                              inspect.getmembers(pfp_func_stats,
-                                                 inspect.isfunction)]
-    implemented_func_transforms = [name for name,data in
-                                   inspect.getmembers(pfp_func_transforms,
-                                                      inspect.isfunction)]
-    implemented_functions = (implemented_func_units +
-                             implemented_func_stats +
-                             implemented_func_transforms)
+    implemented_functions = get_implemented_functions()
     functions = {}
-    units_vars = []
-    stats_vars = []
-    transforms_vars = []
+    labels_by_type = {"units": [], "stats": [], "transforms": []}
     for label in list(info["Variables"].keys()):
         # datetime functions handled elsewhere for now
         if label == "DateTime":
@@ -1749,22 +1756,20 @@ def DoFunctions(ds, info):
             msg = " Requested function " + function_name + " not imlemented, skipping ..."
             logger.error(msg)
             continue
-        if function_name in implemented_func_units:
-            functions[label] = {"type": "units", "name": function_name, "arguments": function_args}
-            units_vars.append(label)
-        elif function_name in implemented_func_stats:
-            functions[label] = {"type": "stats", "name": function_name, "arguments": function_args}
-            stats_vars.append(label)
-        elif function_name in implemented_func_transforms:
-            functions[label] = {"type": "transforms", "name": function_name, "arguments": function_args}
-            transforms_vars.append(label)
+        function_type = implemented_functions[function_name][0]
+        functions[label] = {"type": function_type, "name": function_name, "arguments": function_args}
+        labels_by_type[function_type].append(label)
+    units_vars = labels_by_type["units"]
+    stats_vars = labels_by_type["stats"]
+    transforms_vars = labels_by_type["transforms"]
     series_list = list(ds.root["Variables"].keys())
     for label in units_vars:
         if label not in series_list:
             var = pfp_utils.CreateEmptyVariable(label, nrecs, attr=info["Variables"][label]["Attr"])
             pfp_utils.CreateVariable(ds, var)
         old_units = ds.root["Variables"][label]["Attr"]["units"]
-        result = getattr(pfp_func_units, functions[label]["name"])(ds, label, *functions[label]["arguments"])
+        function = implemented_functions[functions[label]["name"]][1]
+        result = function(ds, label, *functions[label]["arguments"])
         new_units = ds.root["Variables"][label]["Attr"]["units"]
         if result:
             if new_units != old_units:
@@ -1777,7 +1782,8 @@ def DoFunctions(ds, info):
         if label not in series_list:
             var = pfp_utils.CreateEmptyVariable(label, nrecs, attr=info["Variables"][label]["Attr"])
             pfp_utils.CreateVariable(ds, var)
-        result = getattr(pfp_func_stats, functions[label]["name"])(ds, label, *functions[label]["arguments"])
+        function = implemented_functions[functions[label]["name"]][1]
+        result = function(ds, label, *functions[label]["arguments"])
         if result:
             msg = " Completed function for " + label
             logger.info(msg)
@@ -1785,12 +1791,36 @@ def DoFunctions(ds, info):
         if label not in series_list:
             var = pfp_utils.CreateEmptyVariable(label, nrecs, attr=info["Variables"][label]["Attr"])
             pfp_utils.CreateVariable(ds, var)
-        result = getattr(pfp_func_transforms, functions[label]["name"])(ds, label, *functions[label]["arguments"])
+        function = implemented_functions[functions[label]["name"]][1]
+        result = function(ds, label, *functions[label]["arguments"])
         if result:
             msg = " Completed function for " + label
             logger.info(msg)
     return
 
+@functools.lru_cache(maxsize=None)
+def get_implemented_functions():
+    """
+    Purpose:
+     Return a dictionary of the functions that can be used in the L1 control file.
+     The dictionary is built once and reused on later calls.
+    Usage:
+     implemented_functions = pfp_ts.get_implemented_functions()
+     where implemented_functions is a dictionary with the function names as keys
+           and (type, function) tuples as values, type is one of "units",
+           "stats" or "transforms"
+    Side effects:
+     The returned dictionary is shared between calls and must not be modified.
+    """
+    implemented_functions = {}
+    # pfp_func_units takes precedence if a name is in more than one module
+    for function_type, module in [("transforms", pfp_func_transforms),
+                                  ("stats", pfp_func_stats),
+                                  ("units", pfp_func_units)]:
+        for name, function in inspect.getmembers(module, inspect.isfunction):
+            implemented_functions[name] = (function_type, function)
+    return implemented_functions
+
 def CalculateStandardDeviations(ds):
     """
     Purpose:
@@ -2475,6 +2505,8 @@ def InterpolateOverMissing(ds, labels, max_length_hours=0, int_type="linear", su
     ts = int(float(ds.root["Attributes"]["time_step"]))
     max_length_points = int((max_length_hours * float(60)/float(ts)) + 0.5)
     nRecs = int(ds.root["Attributes"]["nc_nrecs"])
+    # convert the Python datetime to a number, this is the same for all variables
+    DateNum = date2num(ds.root["Variables"]["DateTime"]["Data"])
     for label in labels:
         # check that series is in the data structure
         if label not in list(ds.root["Variables"].keys()):
@@ -2504,8 +2536,6 @@ def InterpolateOverMissing(ds, labels, max_length_hours=0, int_type="linear", su
             is_sum = False
             interpolation = int_type
 
-        # convert the Python datetime to a number
-        DateNum = date2num(ds.root["Variables"]["DateTime"]["Data"])
         # index of good values
         mask = numpy.ma.getmaskarray(var["Data"])
         iog = numpy.where(mask == False)[0]
@@ -2522,10 +2552,9 @@ def InterpolateOverMissing(ds, labels, max_length_hours=0, int_type="linear", su
         flag_int = numpy.copy(var["Flag"])
         # do the interpolation
         if interpolation == "linear":
-            # linear interpolation function
-            int_fn = interpolate.interp1d(DateNum[iog], data, bounds_error=False)
-            # interpolate over the whole time series
-            data_int = int_fn(DateNum).astype(numpy.float64)
+            # linear interpolation over the whole time series, NaN outside the good data
+            data_int = numpy.interp(DateNum, DateNum[iog], data,
+                                    left=numpy.nan, right=numpy.nan).astype(numpy.float64)
         elif interpolation == "Akima":
             int_fn = interpolate.Akima1DInterpolator(DateNum[iog], data)
             data_int = int_fn(DateNum).astype(numpy.float64)
@@ -3056,8 +3085,9 @@ def savitzky_golay(y, window_size, order, deriv=0):
     order_range = list(range(order+1))
     half_window = (window_size -1) // 2
     # precompute coefficients
-    b = numpy.mat([[k**i for i in order_range] for k in range(-half_window, half_window+1)])
-    m = numpy.linalg.pinv(b).A[deriv]
+    b = numpy.array([[k**i for i in order_range] for k in range(-half_window, half_window+1)],
+                    dtype=numpy.float64)
+    m = numpy.linalg.pinv(b)[deriv]
     # pad the signal at the extremes with
     # values taken from the signal itself
     firstvals = y[0] - numpy.abs( y[1:half_window+1][::-1] - y[0] )